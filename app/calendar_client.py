@@ -1,9 +1,11 @@
 # app/calendar_client.py
 
+import functools
+import json
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, date, time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, NamedTuple, Optional
 
 from dynamodb import refresh_google_access_token
 # Assuming models.py is in the same directory or accessible via PYTHONPATH
@@ -11,7 +13,8 @@ from models import TimeSlot
 
 from google.oauth2.credentials import Credentials as GoogleCredentials
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build, Resource
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document, Resource
 from googleapiclient.errors import HttpError
 from scheduler_logic import filter_slots_by_preferences # Import the new function
 from models import UserPreferences
@@ -28,6 +31,27 @@ SERVICE_ACCOUNT_FILE = 'credentials/service_account.json'
 import asyncio
 
 
+@functools.lru_cache(maxsize=1)
+def _calendar_discovery_doc() -> Dict[str, Any]:
+    """Parses the bundled Calendar v3 discovery document once per process.
+
+    ``build()`` re-reads and re-parses the ~130 KB document on every call,
+    which dominated client construction since a client is built per request.
+    ``build_from_document`` does not mutate the parsed dict, so it is shared.
+    """
+    return json.loads(discovery_cache.get_static_doc('calendar', 'v3'))
+
+
+class EventSpec(NamedTuple):
+    """The arguments of one add_event call, for batch_add_events."""
+    title: str
+    start_time: datetime
+    end_time: datetime
+    description: Optional[str] = None
+    attendees: Optional[List[str]] = None
+    location: Optional[str] = None
+
+
 # --- Custom Exceptions ---
 
 class CalendarAPIError(Exception):
@@ -55,7 +79,13 @@ class AbstractCalendarClient(ABC):
 
     @abstractmethod
     def get_busy_slots(self, calendar_id: str, start_time: datetime, end_time: datetime) -> List[TimeSlot]:
-        """Fetches busy time slots from the specified calendar."""
+        """
+        Fetches busy time slots from the specified calendar.
+
+        Returns the busy blocks overlapping the half-open range [start_time, end_time);
+        a block that merely touches either bound may be included, so callers that need
+        strict overlap should filter with the same half-open rule.
+        """
         pass
 
     @abstractmethod
@@ -100,6 +130,16 @@ class AbstractCalendarClient(ABC):
         """
         pass
 
+    def batch_add_events(self, events: List[EventSpec]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Adds several events, returning the created event details in the same order
+        (None for an event that could not be created).
+
+        The default issues one add_event call per event; providers with a batch
+        endpoint should override it to save the round trips.
+        """
+        return [self.add_event(*event) for event in events]
+
 
 # --- Google Calendar API Client Implementation ---
 
@@ -168,7 +208,7 @@ class GoogleCalendarAPIClient(AbstractCalendarClient):
                 self.logger.error("Invalid credentials. Cannot proceed.")
                 raise AuthenticationError("Invalid credentials.")
             # Build the service object
-            self._service = build('calendar', 'v3', credentials=credentials)
+            self._service = build_from_document(_calendar_discovery_doc(), credentials=credentials)
             self.logger.info("Google Calendar API service built successfully.")
 
         except Exception as e:
@@ -234,7 +274,8 @@ class GoogleCalendarAPIClient(AbstractCalendarClient):
             end_time: The end of the query range (timezone-aware).
 
         Returns:
-            A list of TimeSlot objects representing busy periods.
+            A list of TimeSlot objects representing busy periods overlapping
+            [start_time, end_time).
 
         Raises:
             APICallError: If the API call fails.
@@ -508,17 +549,7 @@ class GoogleCalendarAPIClient(AbstractCalendarClient):
         try:
             service = self._get_service()
 
-            event = {
-                'summary': title,
-                'description': description,
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                },
-                'attendees': [],
-            }
+            event = self._event_body(title, start_time, end_time, description, attendees, location)
             created_event = service.events().insert(calendarId='primary', body=event).execute()
             return created_event
         except Exception as e:
@@ -526,6 +557,59 @@ class GoogleCalendarAPIClient(AbstractCalendarClient):
             print(f"An error occurred while creating the event: {e}")
             return None
 
+    # Google's batch endpoint accepts at most 50 calls per request
+    BATCH_LIMIT = 50
+
+    def batch_add_events(self, events: List[EventSpec]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Adds several events through the Calendar batch endpoint: one HTTP round trip
+        per BATCH_LIMIT events instead of one per event.
+
+        Returns the created event details in input order; an event whose insert
+        failed maps to None, as with add_event. A batch that fails as a whole is
+        logged and its events left as None, and the remaining batches still run,
+        so events created by earlier batches are always reported.
+        """
+        service = self._get_service()
+        created: List[Optional[Dict[str, Any]]] = [None] * len(events)
+
+        def _collect(request_id: str, response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+            if exception is not None:
+                self.logger.error("Batch insert %s failed: %s", request_id, exception)
+                return
+            created[int(request_id)] = response
+
+        for offset in range(0, len(events), self.BATCH_LIMIT):
+            batch = service.new_batch_http_request(callback=_collect)
+            for index, event in enumerate(events[offset:offset + self.BATCH_LIMIT], start=offset):
+                body = self._event_body(*event)
+                batch.add(service.events().insert(calendarId='primary', body=body), request_id=str(index))
+            try:
+                batch.execute()
+            except Exception as e:
+                self.logger.error("Batch insert of events %d-%d failed: %s",
+                                  offset, min(offset + self.BATCH_LIMIT, len(events)) - 1, e)
+        return created
+
+    @staticmethod
+    def _event_body(title: str, start_time: datetime, end_time: datetime, description: Optional[str],
+                    attendees: Optional[List[str]] = None, location: Optional[str] = None) -> Dict[str, Any]:
+        """Builds the events.insert request body."""
+        body = {
+            'summary': title,
+            'description': description,
+            'start': {
+                'dateTime': start_time.isoformat(),
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+            },
+            'attendees': [{'email': email} for email in attendees or ()],
+        }
+        if location:
+            body['location'] = location
+        return body
+
 
 
 # --- Example Usage ---
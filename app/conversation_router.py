@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from typing import List
 
@@ -34,7 +35,8 @@ async def list_user_conversations(
             detail="You can only access your own conversations"
         )
     try:
-        items = get_user_conversations(user_id)
+        # The DynamoDB scan is blocking; keep it off the event loop
+        items = await asyncio.to_thread(get_user_conversations, user_id)
         conversations = []
         for item in items:
             turns = [ConversationTurn(**turn) for turn in item.get("history", [])]
@@ -5,7 +5,9 @@ from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional, List, Dict, Any, Union
 
-from pydantic import BaseModel, Field
+import orjson
+from pydantic import BaseModel, Field, PrivateAttr
+from pydantic_core import to_jsonable_python
 
 # --- Enums ---
 
@@ -49,6 +51,19 @@ class ToolResult(BaseModel):
                     " Should contain keys like 'status', 'message', 'result_data', etc."
                     " Needs to be serializable (e.g., JSON)."
     )
+
+    def to_json(self) -> str:
+        """
+        Serializes the result with orjson. Same output as model_dump_json() for the
+        payloads our wrappers return; anything orjson can't encode natively
+        (e.g. timedelta) falls back to pydantic's encoder.
+        """
+        return orjson.dumps(
+            {"name": self.name, "response": self.response},
+            default=to_jsonable_python,
+            option=orjson.OPT_UTC_Z,
+        ).decode()
+
     # --- Internal Status Tracking (Optional - may not be sent back to Gemini directly) ---
     # status: ToolResultStatus = Field(..., description="Internal status indicating tool execution outcome.")
     # message: Optional[str] = Field(None, description="Optional message accompanying the status (e.g., error details).")
@@ -67,6 +82,21 @@ class ConversationTurn(BaseModel):
     parts: List[ContentData] = Field(..., description="The content of the turn. Usually a list containing a single item (text, function call, or function response).")
 
     timestamp: Optional[datetime] = Field(default_factory=lambda: datetime.now(timezone.utc), description="Optional timestamp of when the turn occurred. Can be used for logging or debugging.")
+
+    # Storage form of the turn, computed on first use (see to_storage_dict)
+    _cached_dump: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+
+    def to_storage_dict(self) -> Dict[str, Any]:
+        """
+        Returns the JSON-compatible dict used to persist this turn.
+
+        The dump is computed once and cached, so a turn must not be mutated
+        after it has been handed to storage.
+        """
+        if self._cached_dump is None:
+            self._cached_dump = self.model_dump(mode="json")
+        return self._cached_dump
+
     # Helper validator/constructor for convenience (optional)
     @classmethod
     def user_turn(cls, text: str) -> 'ConversationTurn':
@@ -82,7 +112,7 @@ class ConversationTurn(BaseModel):
 
     @classmethod
     def function_turn(cls, tool_result: ToolResult) -> 'ConversationTurn':
-        return cls(role=ConversationRole.FUNCTION, parts=[f"FUNCTION RESULT: {tool_result.model_dump_json()}"])
+        return cls(role=ConversationRole.FUNCTION, parts=[f"FUNCTION RESULT: {tool_result.to_json()}"])
 
 
 # Placeholder for ToolDefinition - should match Gemini API's FunctionDeclaration
@@ -16,7 +16,6 @@ from datetime import date, datetime, time, timedelta
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Any
 
-import pytz  # Recommended for robust timezone handling
 from pydantic import (BaseModel, Field, field_validator,
                       model_validator)
 
@@ -189,6 +188,7 @@ class UserPreferences(BaseModel):
     @classmethod
     def check_valid_timezone(cls, v: str):
         """Validates that the provided timezone string is valid."""
+        import pytz  # Deferred: only needed here, and it is costly to import
         if v not in pytz.all_timezones_set:
             raise ValueError(f"Invalid timezone string: {v}")
         return v
@@ -1,10 +1,14 @@
+import asyncio
+import functools
 import logging
 import uuid
 from datetime import time, timedelta, date
-from typing import List, Dict, Any, Optional
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from google import genai
 from google.genai import types
 import json
+import orjson
 from pydantic import BaseModel, Field
 # --- Interface Imports ---
 # Assuming interfaces and models from previous tasks are defined and importable
@@ -53,6 +57,17 @@ class GenAIClientSingleton:
     def get_instance(*args, **kwargs):
         return GenAIClientSingleton(*args, **kwargs).client
 
+@functools.lru_cache(maxsize=8)
+def _tools_config(tools_json: bytes) -> types.GenerateContentConfig:
+    """
+    Builds the request config for one tool list, keyed by its serialized form.
+
+    Validating the declarations into genai models costs far more than dumping
+    them, and the tool list is the same on every request, so it is done once.
+    The returned config is shared; do not mutate it.
+    """
+    return types.GenerateContentConfig(tools=[types.Tool(function_declarations=orjson.loads(tools_json))])
+
 # --- Placeholder Interfaces/Implementations ---
 # Define dummy classes if real ones aren't available yet
 class AbstractGeminiClient:
@@ -71,8 +86,7 @@ class AbstractGeminiClient:
 
         # Configure the request payload
 
-        tools = types.Tool(function_declarations=request.tools)
-        config = types.GenerateContentConfig(tools=[tools])
+        config = _tools_config(orjson.dumps(request.tools))
         payload = {
             "model": "gemini-2.0-flash",
             "contents": [turn.parts[0] for turn in request.history],
@@ -128,29 +142,49 @@ class AbstractToolExecutor:
         Returns:
             An ExecutorToolResult indicating the outcome.
         """
-        logger = logging.getLogger(__name__)
-        logger.info(f"Executing tool: {call.name}")
+        logger.info("Executing tool: %s", call.name)
 
         # Step 1: Find the appropriate tool wrapper
         tool_wrapper = TOOL_REGISTRY.get(call.name)
         if not tool_wrapper:
-            logger.error(f"Tool '{call.name}' not found in TOOL_REGISTRY.")
-            return ExecutorToolResult(
-                name=call.name,
-                status=ToolResultStatus.ERROR,
-                error_details=f"Tool '{call.name}' not found."
-            )
+            return self._tool_not_found(call)
 
         try:
             # Step 3: Call the wrapper function with call.args and context
             return tool_wrapper.run(call.args, context)
         except Exception as e:
-            logger.exception(f"Error while executing tool '{call.name}': {e}")
-            return ExecutorToolResult(
-                name=call.name,
-                status=ToolResultStatus.ERROR,
-                error_details=f"An error occurred while executing tool '{call.name}': {str(e)}"
-            )
+            return self._tool_failed(call, e)
+
+    async def aexecute_tool(self, call: FunctionCall, context: ExecutionContext) -> ExecutorToolResult:
+        """Async variant of execute_tool(); the wrapper's blocking I/O runs off the event loop."""
+        logger.info("Executing tool: %s", call.name)
+
+        tool_wrapper = TOOL_REGISTRY.get(call.name)
+        if not tool_wrapper:
+            return self._tool_not_found(call)
+
+        try:
+            return await tool_wrapper.arun(call.args, context)
+        except Exception as e:
+            return self._tool_failed(call, e)
+
+    @staticmethod
+    def _tool_not_found(call: FunctionCall) -> ExecutorToolResult:
+        logger.error("Tool '%s' not found in TOOL_REGISTRY.", call.name)
+        return ExecutorToolResult(
+            name=call.name,
+            status=ToolResultStatus.ERROR,
+            error_details=f"Tool '{call.name}' not found."
+        )
+
+    @staticmethod
+    def _tool_failed(call: FunctionCall, e: Exception) -> ExecutorToolResult:
+        logger.exception("Error while executing tool '%s': %s", call.name, e)
+        return ExecutorToolResult(
+            name=call.name,
+            status=ToolResultStatus.ERROR,
+            error_details=f"An error occurred while executing tool '{call.name}': {str(e)}"
+        )
 
 class DummyPrefs(UserPreferences):
     user_id: str = Field(..., description="User ID")
@@ -194,19 +228,24 @@ async def get_user_preferences(user_id: str) -> UserPreferences:
 # Tool Registry
 from tool_wrappers import TOOL_REGISTRY
 
-TOOL_DEFINITIONS: List[ToolDefinition] = [
+# Built once at import and shared by every request; treat as read-only.
+TOOL_DEFINITIONS: Tuple[ToolDefinition, ...] = tuple(
     {
         "name": tool_name,
         "description": tool_wrapper.description,
         "parameters": tool_wrapper.parameters_schema,
     }
     for tool_name, tool_wrapper in TOOL_REGISTRY.items()
-]
+)
+TOOL_DEFINITIONS_BY_NAME: Mapping[str, ToolDefinition] = MappingProxyType(
+    {definition["name"]: definition for definition in TOOL_DEFINITIONS}
+)
 
 logger = logging.getLogger(__name__)
 
 # Configuration
 MAX_GEMINI_TURNS = 2 # Limit LLM calls per user prompt (User -> LLM -> Tool -> LLM -> User)
+MAX_HISTORY_TURNS = 40 # Most recent turns (besides the system prompt) sent back to the LLM
 
 async def handle_chat_request(
     request: ChatRequest,
@@ -239,14 +278,17 @@ async def handle_chat_request(
 
         # 8.2 Load history and context
         logger.info(f"[Session: {session_id}] Loading history and context for user {user_id}")
-        history: List[ConversationTurn] = await session_manager.get_history(session_id)
+        # History and preferences are independent lookups. get_history runs its DynamoDB
+        # read in a worker thread, so a real preferences lookup overlaps with it.
+        history, preferences = await asyncio.gather(
+            session_manager.get_history(session_id, tail=MAX_HISTORY_TURNS),
+            get_user_preferences(user_id), # Task ORCH-9 (using dummy here)
+        )
         if history == None or len(history) == 0 : # Check if session ID was provided but not found
              logger.warning(f"[Session: {session_id}] Provided session ID not found, starting new history.")
              # Optionally create session explicitly if needed by append_turn implementation
              await session_manager.create_session(user_id, session_id) # If create takes session_id
-             history = await session_manager.get_history(session_id)
-
-        preferences = await get_user_preferences(user_id) # Task ORCH-9 (using dummy here)
+             history = await session_manager.get_history(session_id, tail=MAX_HISTORY_TURNS)
 
         # Append current user prompt to history
         user_turn = ConversationTurn.user_turn(prompt_text)
@@ -290,7 +332,7 @@ async def handle_chat_request(
                     preferences=preferences,
                     calendar_client=calendar_client
                 )
-                tool_exec_result: ExecutorToolResult = tool_executor.execute_tool(
+                tool_exec_result: ExecutorToolResult = await tool_executor.aexecute_tool(
                     call=gemini_response.function_call,
                     context=exec_context
                 )
@@ -323,8 +365,9 @@ async def handle_chat_request(
                     logger.error(f"Unexpected ToolResultStatus: {tool_exec_result.status}")
                     gemini_tool_result_payload["error_message"] = "Unexpected tool execution status."
 
+                # Both fields come from our own executor, so skip re-validating the payload
                 function_response_turn = ConversationTurn.function_turn(
-                    ToolResult(
+                    ToolResult.model_construct(
                         name=tool_exec_result.name,
                         response=gemini_tool_result_payload # Send structured result back
                     )
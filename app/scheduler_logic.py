@@ -1,38 +1,17 @@
 # app/scheduler_logic.py
 
-from zoneinfo import ZoneInfo  # Python 3.9+
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # Python 3.9+
+import functools
 import logging
 import bisect
+from array import array
 from datetime import datetime, timedelta, date, time
 from typing import List, Tuple, Dict, Optional
 
 from pydantic import BaseModel, Field
-import pytz # For robust timezone handling
-# Assuming models and timeline are in the same app directory or accessible
-try:
-    from models import MustDoActivity, WantToDoActivity, TimeSlot, ActivityStatus, PriorityLevel, ActivityCategory, \
+from models import MustDoActivity, WantToDoActivity, TimeSlot, ActivityStatus, PriorityLevel, ActivityCategory, \
     UserPreferences, DayOfWeek
-    from timeline import ScheduleTimeline, ScheduledItem
-except ImportError:
-    # Fallback for running script directly or if structure differs
-    print("Warning: Could not import models or timeline. Using dummy classes.")
-    # Define dummy classes if needed for standalone testing
-    class MustDoActivity:
-        def __init__(self, id, title, start_time, end_time, priority):
-            self.id = id
-            self.title = title
-            self.start_time = start_time
-            self.end_time = end_time
-            self.priority = priority
-    class ScheduleTimeline:
-        def __init__(self): self._items = []
-        def add_item(self, item): print(f"Dummy Add: {item}")
-        def find_overlapping_items(self, start, end): print(f"Dummy Find Overlap: {start}-{end}"); return []
-    class ScheduledItem:
-         def __init__(self, start_time, end_time, activity_obj):
-            self.start_time = start_time
-            self.end_time = end_time
-            self.activity_obj = activity_obj
+from timeline import ScheduleTimeline, ScheduledItem, to_epoch_ns
 
 
 # --- Conflict Information Structure (Sub-task 3.3) ---
@@ -91,10 +70,9 @@ def place_must_do_activities(
     for activity in sorted_must_do_list:
         logger.debug(f"Attempting to place '{activity.title}' ({activity.start_time} - {activity.end_time})")
 
-        # Find items on the timeline that overlap with the current activity's time range
-        overlapping_items = timeline.find_overlapping_items(activity.start_time, activity.end_time)
-
-        if overlapping_items:
+        # Only collect the overlapping items when there is a conflict to report
+        if timeline.intersects_any(activity.start_time, activity.end_time):
+            overlapping_items = timeline.find_overlapping_items(activity.start_time, activity.end_time)
             # Conflict detected! Record conflict info for each overlap.
             logger.warning(f"Conflict detected for '{activity.title}'!")
             for existing_item in overlapping_items:
@@ -129,11 +107,8 @@ def place_must_do_activities(
             # No conflicts, add the activity to the timeline
             logger.debug(f"No conflicts found for '{activity.title}'. Adding to timeline.")
             try:
-                scheduled_item = ScheduledItem(
-                    start_time=activity.start_time,
-                    end_time=activity.end_time,
-                    activity_obj=activity
-                )
+                # MustDoActivity already guarantees aware times with end > start
+                scheduled_item = ScheduledItem.unsafe_new(activity.start_time, activity.end_time, activity)
                 timeline.add_item(scheduled_item)
             except ValueError as e:
                  logger.error(f"Error creating ScheduledItem for '{activity.title}': {e}. Skipping.")
@@ -145,6 +120,49 @@ def place_must_do_activities(
     # Return the timeline (which was modified in place) and the list of conflicts
     return timeline, conflicts
 
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _first_fitting_slot(slot_free_ns: array, needed_ns: int) -> int:
+    """Returns the index of the first slot with at least needed_ns free, or -1."""
+    for slot_index, free_ns in enumerate(slot_free_ns):
+        if free_ns >= needed_ns:
+            return slot_index
+    return -1
+
+
+def schedule_single(
+    activity: WantToDoActivity,
+    available_slots: List[TimeSlot],
+    not_before: Optional[datetime] = None
+) -> Optional[TimeSlot]:
+    """
+    First-fit for a single activity: the earliest placement inside available_slots.
+
+    The one-activity case of schedule_want_to_do_basic without its bookkeeping: one
+    pass over the slots, no sorting, no copies and no result map. Slots need not be
+    sorted and are not modified, nor is the activity's status.
+
+    Args:
+        activity: The activity to place; only estimated_duration is used.
+        available_slots: Free time to choose from.
+        not_before: Optional earliest start; slots beginning earlier are clipped to it.
+
+    Returns:
+        The TimeSlot assigned to the activity, or None if no slot has room.
+    """
+    needed = activity.estimated_duration
+    best_start: Optional[datetime] = None
+    for slot in available_slots:
+        start = slot.start_time if not_before is None or slot.start_time >= not_before else not_before
+        if slot.end_time - start >= needed and (best_start is None or start < best_start):
+            best_start = start
+    if best_start is None:
+        return None
+    # Both bounds are aware and end > start by construction, so skip TimeSlot's validators
+    return TimeSlot.model_construct(start_time=best_start, end_time=best_start + needed)
+
+
 def schedule_want_to_do_basic(
     want_to_do_list: List[WantToDoActivity],
     available_slots: List[TimeSlot]
@@ -174,63 +192,44 @@ def schedule_want_to_do_basic(
 
     scheduled_mapping: Dict[str, TimeSlot] = {}
     unscheduled_activities: List[WantToDoActivity] = []
-    # Work on a copy of the slots list to avoid modifying the original input list directly
-    # This also makes modifying the list during iteration safer.
+    # Keep the remaining free time as parallel arrays (slot start, free nanoseconds)
+    # instead of a list of TimeSlot models: the fit test becomes a plain int comparison
+    # and consuming part of a slot no longer builds and validates a new TimeSlot.
     remaining_slots = sorted(available_slots, key=lambda s: s.start_time) # Ensure sorted
+    slot_starts: List[datetime] = [slot.start_time for slot in remaining_slots]
+    slot_free_ns = array('q', [to_epoch_ns(slot.end_time) - to_epoch_ns(slot.start_time) for slot in remaining_slots])
+
+    # Longest free stretch left; activities longer than this can skip the scan entirely
+    max_free_ns = max(slot_free_ns, default=0)
 
     for activity in want_to_do_list:
-        logger.debug(f"Trying to schedule '{activity.title}' (duration: {activity.estimated_duration}, priority: {activity.priority})")
-        is_scheduled = False
-        # Iterate through the *indices* of remaining_slots because we might modify the list
-        slot_index = 0
-        while slot_index < len(remaining_slots):
-            slot = remaining_slots[slot_index]
-            logger.debug(f"  Checking slot: {slot.start_time} - {slot.end_time} (duration: {slot.duration})")
-
-            # Check if the slot is long enough
-            if slot.duration >= activity.estimated_duration:
-                logger.debug(f"    Slot is suitable. Scheduling '{activity.title}'.")
-                # Schedule the activity at the beginning of this slot
-                assigned_slot = TimeSlot(
-                    start_time=slot.start_time,
-                    end_time=slot.start_time + activity.estimated_duration
-                )
-                scheduled_mapping[activity.id] = assigned_slot
-                activity.status = ActivityStatus.SCHEDULED # Update status
-
-                # Update the remaining_slots list
-                if slot.duration == activity.estimated_duration:
-                    # Slot is fully consumed, remove it
-                    remaining_slots.pop(slot_index)
-                    logger.debug(f"    Removed fully consumed slot.")
-                    # Do not increment slot_index, the next item is now at the current index
-                else:
-                    # Slot is partially consumed, update its start time
-                    try:
-                        updated_slot = TimeSlot(
-                            start_time=assigned_slot.end_time,
-                            end_time=slot.end_time
-                        )
-                        remaining_slots[slot_index] = updated_slot
-                        logger.debug(f"    Updated partially consumed slot to: {updated_slot.start_time} - {updated_slot.end_time}")
-                    except ValueError as e:
-                         # This might happen if rounding leads to end <= start
-                         logger.warning(f"Could not update slot after scheduling {activity.title} due to invalid resulting times ({assigned_slot.end_time} / {slot.end_time}). Removing slot instead. Error: {e}")
-                         remaining_slots.pop(slot_index)
-                         # Do not increment slot_index
-                         continue # Skip incrementing index
-
-                    # Increment index because we modified the current slot, not removed it
-                    slot_index += 1
-
-                is_scheduled = True
-                break # Move to the next activity
+        logger.debug("Trying to schedule '%s' (duration: %s, priority: %s)", activity.title, activity.estimated_duration, activity.priority)
+        needed_ns = activity.estimated_duration // _ONE_MICROSECOND * 1000
+        slot_index = _first_fitting_slot(slot_free_ns, needed_ns) if needed_ns <= max_free_ns else -1
+        if slot_index >= 0:
+            slot_start = slot_starts[slot_index]
+            free_ns = slot_free_ns[slot_index]
+            logger.debug("    Slot starting %s is suitable. Scheduling '%s'.", slot_start, activity.title)
+            # Schedule the activity at the beginning of this slot
+            assigned_slot = TimeSlot(
+                start_time=slot_start,
+                end_time=slot_start + activity.estimated_duration
+            )
+            scheduled_mapping[activity.id] = assigned_slot
+            activity.status = ActivityStatus.SCHEDULED # Update status
+
+            # Update the remaining free time
+            if free_ns == needed_ns:
+                # Slot is fully consumed, remove it
+                del slot_starts[slot_index]
+                del slot_free_ns[slot_index]
             else:
-                # Slot is too short, move to the next slot
-                logger.debug(f"    Slot is too short.")
-                slot_index += 1
-
-        if not is_scheduled:
+                # Slot is partially consumed, move its start past the new activity
+                slot_starts[slot_index] = assigned_slot.end_time
+                slot_free_ns[slot_index] = free_ns - needed_ns
+            if free_ns == max_free_ns:
+                max_free_ns = max(slot_free_ns, default=0)
+        else:
             logger.info(f"Could not find a suitable slot for '{activity.title}'. Marking as unscheduled.")
             unscheduled_activities.append(activity)
             # Ensure status is TODO if it failed scheduling
@@ -258,7 +257,7 @@ if __name__ == '__main__':
     must_do_tasks_for_placement = [must_do_1, must_do_2]
     timeline, _ = place_must_do_activities(must_do_tasks_for_placement, timeline)
     print("\n--- Timeline after MustDo ---")
-    for item in timeline.get_all_items(): print(item)
+    for item in timeline: print(item)
     print("--- End Timeline ---")
 
     # --- Define Available Slots (Example - In reality, this comes from Task 2/5) ---
@@ -325,6 +324,12 @@ if __name__ == '__main__':
 
     # --- Preference-Based Slot Filtering (Task 5.1 / 5.2) ---
 
+@functools.lru_cache(maxsize=64)
+def _get_tz(tz_name: str) -> ZoneInfo:
+    """Returns the timezone for tz_name, cached across calls."""
+    return ZoneInfo(tz_name)
+
+
 def filter_slots_by_preferences(
         raw_free_slots: List[TimeSlot],
         preferences: UserPreferences,
@@ -345,7 +350,7 @@ def filter_slots_by_preferences(
 
     Raises:
         ValueError: If timeslots or preferences contain invalid timezone info.
-        pytz.UnknownTimeZoneError: If preferences.time_zone is invalid.
+        zoneinfo.ZoneInfoNotFoundError: If preferences.time_zone is invalid.
     """
     filter_logger = logging.getLogger(__name__)
     filter_logger.info(f"Filtering {len(raw_free_slots)} raw free slots by user preferences.")
@@ -354,8 +359,8 @@ def filter_slots_by_preferences(
         return []
 
     try:
-        user_tz = pytz.timezone(preferences.time_zone)
-    except pytz.UnknownTimeZoneError as e:
+        user_tz = _get_tz(preferences.time_zone)
+    except (ZoneInfoNotFoundError, ValueError) as e:
         filter_logger.error(f"Invalid timezone in preferences: {preferences.time_zone}")
         raise e
 
@@ -396,8 +401,8 @@ def filter_slots_by_preferences(
 
             # Define the user's available interval for this specific day
             work_start_time, work_end_time = working_times
-            day_work_start_dt = user_tz.localize(datetime.combine(current_day, work_start_time))
-            day_work_end_dt = user_tz.localize(datetime.combine(current_day, work_end_time))
+            day_work_start_dt = datetime.combine(current_day, work_start_time, tzinfo=user_tz)
+            day_work_end_dt = datetime.combine(current_day, work_end_time, tzinfo=user_tz)
 
             # Calculate the intersection of the current raw slot with the working hours of this day
             # Intersection start = max(slot_start, work_start)
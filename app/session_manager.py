@@ -1,12 +1,16 @@
 # app/session_manager.py
 
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import uuid
 from zoneinfo import ZoneInfo
 
+import orjson
+
+from botocore.exceptions import ClientError
 from pydantic import BaseModel, Field
 # Assuming pymongo or motor is used for MongoDB interaction
 # from pymongo.database import Database
@@ -19,6 +23,9 @@ from dynamodb import get_dynamodb_resource
 
 logger = logging.getLogger(__name__)
 
+# Time zone the default system prompt is written for
+_PARIS_TZ = ZoneInfo("Europe/Paris")
+
 # --- MongoDB Document Structure (Conceptual) ---
 # Collection Name: chat_sessions
 #
@@ -58,12 +65,16 @@ class AbstractSessionManager(ABC):
     """Defines the interface for managing conversation session history."""
 
     @abstractmethod
-    async def get_history(self, session_id: str) -> List[ConversationTurn]:
+    async def get_history(self, session_id: str, tail: Optional[int] = None) -> List[ConversationTurn]:
         """
         Retrieves the conversation history for a given session ID.
 
         Args:
             session_id: The unique identifier for the session.
+            tail: If given, only the system prompt and about the last `tail`
+                  user/model/function turns are returned. The cut is moved back
+                  to the nearest user turn, so it never starts on a model or
+                  function turn whose request was dropped.
 
         Returns:
             A list of ConversationTurn objects, ordered chronologically.
@@ -71,6 +82,26 @@ class AbstractSessionManager(ABC):
         """
         pass
 
+    async def get_histories(self, session_ids: List[str]) -> Dict[str, List[ConversationTurn]]:
+        """
+        Retrieves the conversation histories of several sessions.
+
+        Implementations backed by a store with batch reads should override this;
+        the default issues one get_history call per session.
+
+        Args:
+            session_ids: The sessions to fetch.
+
+        Returns:
+            A dict mapping each found session ID to its history.
+        """
+        histories = {}
+        for session_id in session_ids:
+            history = await self.get_history(session_id)
+            if history:
+                histories[session_id] = history
+        return histories
+
     @abstractmethod
     async def append_turn(self, session_id: str, turn: ConversationTurn):
         """
@@ -100,12 +131,10 @@ class AbstractSessionManager(ABC):
 
 # --- MongoDB Implementation (Interface Definition) ---
 
-default_session_history = [
-            ConversationTurn(role=ConversationRole.SYSTEM,
-                             parts=[f''' You are an advanced language model responsible for scheduling activities based on user preferences and calendar availability. When a user provides a prompt, you should intelligently infer and guess any missing parameters from the context provided by the user. Do not enforce the requirement for the user to specify every precise parameter. Instead, use your understanding to fill in the gaps and ensure the function call is complete and valid.
+_SYSTEM_INSTRUCTION_TEMPLATE = ''' You are an advanced language model responsible for scheduling activities based on user preferences and calendar availability. When a user provides a prompt, you should intelligently infer and guess any missing parameters from the context provided by the user. Do not enforce the requirement for the user to specify every precise parameter. Instead, use your understanding to fill in the gaps and ensure the function call is complete and valid.
                                 Your task is to create a calendar event based on the user's request. You will receive a function call with parameters such as event name, start time, end time, and any other relevant details. If the user does not specify all required parameters, you should infer and guess the missing values based on the context provided.
-Current Date and Time : {datetime.now(ZoneInfo("Europe/Paris")).isoformat()}
-Current zone info is : {ZoneInfo("Europe/Paris")}
+Current Date and Time : {now}
+Current zone info is : {tz}
 Instructions: Assistant should follow these instructions:
 Infer Missing Parameters: If the user does not specify all required parameters, use the context provided to infer and guess the missing values. Use the current date and time as a reference point. If the user said "tomorrow", use the next day from the current date for instance. If the user did not specify a time, use the current time as a reference and adjust accordingly. Guess the duration based on the context (e.g., if the user said "lunch", assume 1 hour).
 Contextual Understanding: Leverage your understanding of natural language to fill in gaps and ensure the function call is complete.
@@ -113,59 +142,238 @@ Human-Centric Approach: Remember that users may not always provide precise detai
 Response with Event Details: In the next turn, when the tool is executed successfully with the parameters you have provided, the created event details will be passed back to you by the program. Respond to the user in general language, including the event details and a link where the user can check the created event.
 Suggest Next Activities: Make suggestions about possible next activities the user may want to pursue based on the context and the scheduled event.
 MANDATORY: Do not ask the user for more clarification. Always infer and guess the missing parameters based on the context provided by the user. When prompted for the task, always respond with a function call that includes all necessary parameters, even if some are inferred. If the user does not specify a time, use the current time as a reference and adjust accordingly. If the user does not specify a duration, assume 1 hour by default.
-                             '''],
-                             timestamp=datetime.now(timezone.utc)-timedelta(minutes=3)),
-        ]
+                             '''
+
+# Last built system instruction as one (key, value) pair, so a concurrent reader
+# never sees a new key with an old value. The prompt only needs minute precision,
+# so it is formatted at most once per (time zone, minute).
+_last_system_instruction: Tuple[Optional[Tuple[str, datetime]], str] = (None, "")
+
+
+def build_system_instruction(tz: ZoneInfo = _PARIS_TZ) -> str:
+    """Returns the system prompt stamped with the current time in `tz`."""
+    global _last_system_instruction
+    now = datetime.now(tz)
+    key = (str(tz), now.replace(second=0, microsecond=0))
+    cached_key, cached_value = _last_system_instruction
+    if key == cached_key:
+        return cached_value
+    value = _SYSTEM_INSTRUCTION_TEMPLATE.format(now=now.isoformat(), tz=tz)
+    _last_system_instruction = (key, value)
+    return value
+
+
+def _system_turn(instruction: str) -> ConversationTurn:
+    return ConversationTurn(role=ConversationRole.SYSTEM, parts=[instruction],
+                            timestamp=datetime.now(timezone.utc)-timedelta(minutes=3))
+
+
+# Storage forms of the system turns for the current instruction, rebuilt only
+# when build_system_instruction returns a new string: the dumped dicts and the
+# same list pre-serialized to the JSON string stored in `system_prompt`.
+# Replaced as a whole, like _last_system_instruction.
+_last_default_history: Dict[str, Any] = {"instruction": None, "dumped": [], "json": "[]"}
+
+
+def _refresh_default_history() -> Dict[str, Any]:
+    global _last_default_history
+    instruction = build_system_instruction()
+    current = _last_default_history
+    if instruction is not current["instruction"]:
+        dumped = [_system_turn(instruction).to_storage_dict()]
+        current = {"instruction": instruction, "dumped": dumped, "json": orjson.dumps(dumped).decode()}
+        _last_default_history = current
+    return current
+
+
+def _default_history_dumped() -> List[Dict[str, Any]]:
+    return _refresh_default_history()["dumped"]
+
+
+def _default_system_json() -> str:
+    return _refresh_default_history()["json"]
+
+
 class DynamoSessionManager(AbstractSessionManager):
     """Session manager implementation backed by DynamoDB."""
 
+    # Number of times append_turn re-reads the version and retries after losing
+    # a race with another writer before giving up.
+    MAX_APPEND_ATTEMPTS = 3
+    # BatchGetItem accepts at most 100 keys per request.
+    BATCH_GET_LIMIT = 100
+    MAX_BATCH_GET_RETRIES = 5
+
     def __init__(self):
-        self.table = get_dynamodb_resource().Table(
+        self._dynamodb = get_dynamodb_resource()
+        self.table = self._dynamodb.Table(
             settings.DYNAMODB_CHAT_SESSIONS_TABLE_NAME
         )
+        # Last known `version` attribute per session, filled by get_history,
+        # create_session and successful appends. When present it is the expected
+        # version of the conditional update in append_turn.
+        self._versions: Dict[str, int] = {}
+
+    def _read_after_conflict(self, session_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """
+        Re-reads the session's version and last stored turn after a lost version race.
+
+        Strongly consistent, so the retry never sees the stale version that just
+        failed the condition again.
+        """
+        response = self.table.get_item(
+            Key={"session_id": session_id},
+            ProjectionExpression="#v, #h",
+            ExpressionAttributeNames={"#v": "version", "#h": "history"},
+            ConsistentRead=True,
+        )
+        item = response.get("Item", {})
+        version = int(item.get("version", 0))
+        self._versions[session_id] = version
+        history = item.get("history") or []
+        return version, (history[-1] if history else None)
 
     async def create_session(self, user_id: str, session_id: str) -> str:
         now = int(datetime.now(timezone.utc).timestamp())
         item = {"session_id": session_id, "user_id": user_id, "created_at": now, "last_updated_at": now,
-                "history": [turn.model_dump(mode="json") for turn in default_session_history]}
+                # The system prompt is kept apart from the growing turn list, as
+                # one pre-serialized JSON string, so get_history can return a
+                # short tail without reading it back.
+                "system_prompt": _default_system_json(), "history": [], "version": 0}
         self.table.put_item(Item=item)
+        self._versions[session_id] = 0
         return session_id
 
     async def append_turn(self, session_id: str, turn: ConversationTurn):
         if not turn.timestamp:
             turn.timestamp = datetime.now(timezone.utc)
-        turn_dict = turn.model_dump(mode="json")
-        try:
-            response = self.table.update_item(
-                Key={"session_id": session_id},
-                UpdateExpression=(
-                    "SET history = list_append(if_not_exists(history, :empty), :turn), "
-                    "last_updated_at = :updated, "
-                    "user_id = if_not_exists(user_id, :user_id), "
-                    "created_at = if_not_exists(created_at, :created_at)"
-                ),
-                ExpressionAttributeValues={
-                    ":turn": [turn_dict],
-                    ":updated": int(turn.timestamp.timestamp()),
-                    ":empty": [],
-                    ":user_id": "unknown",  # Default value if user_id is missing
-                    ":created_at": 0,  # Default value if created_at is missing
-                },
-                ReturnValues="UPDATED_NEW",  # Optional: Returns the updated attributes
-            )
-            # Log the response for debugging
-            logger.info(f"Successfully updated session {session_id}: {response}")
-        except Exception as e:
-            logger.error(f"Failed to append turn to session {session_id}: {e}")
-            raise
-
-    async def get_history(self, session_id: str) -> List[ConversationTurn]:
-        response = self.table.get_item(Key={"session_id": session_id})
+        turn_dict = turn.to_storage_dict()
+        # Only a version this manager saw in get_history/create_session ties the
+        # write to what the caller read; without one, append unconditionally
+        # rather than spend a read on a version nobody looked at.
+        expected_version = self._versions.get(session_id)
+        values = {
+            ":turn": [turn_dict],
+            ":updated": int(turn.timestamp.timestamp()),
+            ":empty": [],
+            ":user_id": "unknown",  # Default value if user_id is missing
+            ":created_at": 0,  # Default value if created_at is missing
+            ":one": 1,
+        }
+
+        for attempt in range(1, self.MAX_APPEND_ATTEMPTS + 1):
+            condition = {}
+            if expected_version is not None:
+                values[":expected_version"] = expected_version
+                # Sessions written before versioning have no attribute yet.
+                condition["ConditionExpression"] = "attribute_not_exists(#v) OR #v = :expected_version"
+            try:
+                response = self.table.update_item(
+                    Key={"session_id": session_id},
+                    UpdateExpression=(
+                        "SET history = list_append(if_not_exists(history, :empty), :turn), "
+                        "last_updated_at = :updated, "
+                        "user_id = if_not_exists(user_id, :user_id), "
+                        "created_at = if_not_exists(created_at, :created_at) "
+                        "ADD #v :one"
+                    ),
+                    ExpressionAttributeNames={"#v": "version"},
+                    ExpressionAttributeValues=values,
+                    ReturnValues="UPDATED_NEW",  # Optional: Returns the updated attributes
+                    **condition,
+                )
+                self._versions[session_id] = int(response["Attributes"]["version"])
+                # Log the response for debugging
+                logger.info(f"Successfully updated session {session_id}: {response}")
+                return
+            except ClientError as e:
+                if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+                    logger.error(f"Failed to append turn to session {session_id}: {e}")
+                    raise
+                if attempt == self.MAX_APPEND_ATTEMPTS:
+                    logger.error(f"Giving up appending turn to session {session_id} after {attempt} version conflicts")
+                    raise
+                logger.warning(f"Version conflict appending to session {session_id} (attempt {attempt}), retrying")
+                self._versions.pop(session_id, None)
+                expected_version, last_turn = self._read_after_conflict(session_id)
+                if last_turn == turn_dict:
+                    # An earlier attempt whose response was lost (and retried by
+                    # botocore) already stored this turn; do not append it twice
+                    logger.info(f"Turn already stored in session {session_id}, not appending again")
+                    return
+            except Exception as e:
+                logger.error(f"Failed to append turn to session {session_id}: {e}")
+                raise
+
+    async def get_history(self, session_id: str, tail: Optional[int] = None) -> List[ConversationTurn]:
+        # Both modes read the stored system prompt, so the model always gets the
+        # instructions the session was created with. DynamoDB bills a GetItem on
+        # the whole item whatever the projection, so tail mode saves decoding
+        # and prompt size, not read capacity.
+        attribute_names = {"#h": "history", "#v": "version", "#sp": "system_prompt"}
+        # boto3 is blocking; keep the read off the event loop so callers can
+        # overlap it with other lookups
+        response = await asyncio.to_thread(
+            self.table.get_item,
+            Key={"session_id": session_id},
+            ProjectionExpression=", ".join(attribute_names),
+            ExpressionAttributeNames=attribute_names,
+        )
         item = response.get("Item")
         if not item:
             return []
+        return self._turns_from_item(session_id, item, tail)
+
+    async def get_histories(self, session_ids: List[str]) -> Dict[str, List[ConversationTurn]]:
+        """Fetches full histories with BatchGetItem, 100 keys per request."""
+        table_name = self.table.name
+        histories: Dict[str, List[ConversationTurn]] = {}
+        unique_ids = list(dict.fromkeys(session_ids))
+        for i in range(0, len(unique_ids), self.BATCH_GET_LIMIT):
+            request_items = {
+                table_name: {
+                    "Keys": [{"session_id": sid} for sid in unique_ids[i:i + self.BATCH_GET_LIMIT]],
+                    "ConsistentRead": False,
+                }
+            }
+            for attempt in range(self.MAX_BATCH_GET_RETRIES + 1):
+                response = self._dynamodb.batch_get_item(RequestItems=request_items)
+                for item in response.get("Responses", {}).get(table_name, []):
+                    histories[item["session_id"]] = self._turns_from_item(item["session_id"], item, None)
+                request_items = response.get("UnprocessedKeys") or {}
+                if not request_items:
+                    break
+                if attempt == self.MAX_BATCH_GET_RETRIES:
+                    logger.error(f"Giving up on {len(request_items[table_name]['Keys'])} unprocessed session keys")
+                    break
+                # Throttled keys come back unprocessed; back off before retrying them.
+                await asyncio.sleep(0.05 * (2 ** attempt))
+        return histories
+
+    def _turns_from_item(self, session_id: str, item: Dict[str, Any], tail: Optional[int]) -> List[ConversationTurn]:
+        self._versions[session_id] = int(item.get("version", 0))
         history_data = item.get("history", [])
-        return [ConversationTurn(**d) for d in history_data]
+        # Sessions created before the split store the system prompt as the
+        # leading turns of `history`.
+        split = 0
+        while split < len(history_data) and history_data[split].get("role") == ConversationRole.SYSTEM.value:
+            split += 1
+        system_data, history_data = history_data[:split], history_data[split:]
+        if not system_data:
+            system_data = item.get("system_prompt")
+            if isinstance(system_data, str):
+                system_data = orjson.loads(system_data)
+            if not system_data:
+                # Sessions first written by append_turn have no stored prompt
+                system_data = _default_history_dumped()
+        if tail is not None:
+            start = max(len(history_data) - tail, 0) if tail > 0 else len(history_data)
+            # Start on a user turn: Gemini rejects a function result (or a model
+            # reply) whose preceding call was cut off
+            while 0 < start < len(history_data) and history_data[start].get("role") != ConversationRole.USER.value:
+                start -= 1
+            history_data = history_data[start:]
+        return [ConversationTurn(**d) for d in system_data] + [ConversationTurn(**d) for d in history_data]
 
 
 # --- Example Usage ---
@@ -1,22 +1,28 @@
 # app/timeline.py
 
 import bisect
-from datetime import datetime, timedelta
-from typing import List, Any, Optional
-
-# Assuming models.py is in the same directory or accessible via PYTHONPATH
-try:
-    # Import specific activity types if needed for type hinting or logic
-    from models import TimeSlot, MustDoActivity, WantToDoActivity
-    ActivityObject = Any # Or Union[MustDoActivity, WantToDoActivity, ...] if defined
-except ImportError:
-    # Fallback for running script directly or if structure differs
-    print("Warning: Could not import models. Using basic types.")
-    # Define dummy classes if models are unavailable for standalone testing
-    class TimeSlot: pass
-    class MustDoActivity: pass
-    class WantToDoActivity: pass
-    ActivityObject = Any # Define ActivityObject as Any if models aren't available
+import math
+from array import array
+from collections import OrderedDict
+from operator import attrgetter
+from datetime import datetime, timedelta, timezone
+from typing import List, Any, Iterable, Iterator, Optional, Tuple
+
+from sortedcontainers import SortedKeyList
+
+# Import specific activity types if needed for type hinting or logic
+from models import TimeSlot, MustDoActivity, WantToDoActivity
+
+ActivityObject = Any # Or Union[MustDoActivity, WantToDoActivity, ...] if defined
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_epoch_ns(moment: datetime) -> int:
+    """Converts a timezone-aware datetime to integer nanoseconds since the epoch, exactly."""
+    return (moment - _EPOCH) // _ONE_MICROSECOND * 1000
+
 
 class ScheduledItem:
     """
@@ -25,6 +31,8 @@ class ScheduledItem:
     Stores the time boundaries and a reference to the original activity object.
     Implements comparison methods based on start_time for sorting.
     """
+    # Timelines hold many of these; slots keep them small and attribute access fast
+    __slots__ = ("start_time", "end_time", "activity_obj", "_start_ns", "_end_ns")
     def __init__(self, start_time: datetime, end_time: datetime, activity_obj: ActivityObject):
         """
         Initializes a ScheduledItem.
@@ -46,24 +54,46 @@ class ScheduledItem:
         self.start_time: datetime = start_time
         self.end_time: datetime = end_time
         self.activity_obj: ActivityObject = activity_obj
+        # Integer epoch nanoseconds, cached so ordering and overlap checks
+        # compare plain ints instead of aware datetimes
+        self._start_ns: int = to_epoch_ns(start_time)
+        self._end_ns: int = to_epoch_ns(end_time)
+
+    @classmethod
+    def unsafe_new(cls, start_time: datetime, end_time: datetime, activity_obj: ActivityObject) -> 'ScheduledItem':
+        """
+        Builds a ScheduledItem without validating its arguments.
+
+        Only for callers whose times are already known to be timezone-aware
+        with end_time > start_time (e.g. taken from a validated model).
+        """
+        self = cls.__new__(cls)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.activity_obj = activity_obj
+        self._start_ns = to_epoch_ns(start_time)
+        self._end_ns = to_epoch_ns(end_time)
+        return self
 
     # --- Comparison methods for sorting using bisect ---
     def __lt__(self, other: 'ScheduledItem') -> bool:
-        # Primarily sort by start time, then end time as a tie-breaker
-        if not isinstance(other, ScheduledItem):
-            return NotImplemented
-        if self.start_time != other.start_time:
-            return self.start_time < other.start_time
-        return self.end_time < other.end_time
+        # Primarily sort by start time, then end time as a tie-breaker.
+        # Only ever compared with other ScheduledItems.
+        if self._start_ns != other._start_ns:
+            return self._start_ns < other._start_ns
+        return self._end_ns < other._end_ns
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, ScheduledItem):
             return NotImplemented
-        return (self.start_time == other.start_time and
-                self.end_time == other.end_time and
+        return (self._start_ns == other._start_ns and
+                self._end_ns == other._end_ns and
                 # Optionally compare activity_obj if strict equality is needed
                 self.activity_obj == other.activity_obj)
 
+    # Mutable and compared by value, so deliberately unhashable
+    __hash__ = None
+
     def __repr__(self) -> str:
         """Provides a developer-friendly string representation."""
         activity_title = getattr(self.activity_obj, 'title', 'N/A')
@@ -72,15 +102,134 @@ class ScheduledItem:
                 f"activity='{activity_title}')")
 
 
+# Sort keys as C-level attrgetters rather than Python functions, so sorting and
+# SortedKeyList bisects run no interpreted code per element.
+# Timeline order: start time, then end time as a tie-breaker.
+_timeline_key = attrgetter("_start_ns", "_end_ns")
+_end_key = attrgetter("_end_ns")
+
+
+# Below this many items a plain scan of the sorted list beats walking the tree.
+_LINEAR_SCAN_THRESHOLD = 32
+# Number of recent overlap query results each timeline remembers.
+_QUERY_CACHE_SIZE = 256
+
+
+class _IntervalNode:
+    """
+    Node of a centered interval tree.
+
+    Holds every item containing `center` (start <= center < end), sorted
+    both by start and by end; `start_keys`/`end_keys` mirror those lists with
+    the bare timestamps, packed into typed arrays (contiguous int64s rather
+    than pointers to int objects), so bisecting them needs no key function
+    and touches little memory. Items ending at or before the center live in the
+    left subtree, items starting after it in the right subtree. `size` counts
+    the items of the whole subtree and drives the rebalancing in add_item;
+    `min_start`/`max_end` bound the whole subtree so queries can skip it.
+    """
+    __slots__ = ("center", "by_start", "start_keys", "by_end", "end_keys",
+                 "left", "right", "size", "min_start", "max_end")
+
+    def __init__(self, center: int):
+        self.center = center
+        self.by_start: List[ScheduledItem] = []
+        self.start_keys = array("q")
+        self.by_end: List[ScheduledItem] = []
+        self.end_keys = array("q")
+        self.left: Optional['_IntervalNode'] = None
+        self.right: Optional['_IntervalNode'] = None
+        self.size = 0
+        self.min_start = math.inf
+        self.max_end = -math.inf
+
+    def add(self, item: ScheduledItem) -> None:
+        i = bisect.bisect_right(self.start_keys, item._start_ns)
+        self.start_keys.insert(i, item._start_ns)
+        self.by_start.insert(i, item)
+        i = bisect.bisect_right(self.end_keys, item._end_ns)
+        self.end_keys.insert(i, item._end_ns)
+        self.by_end.insert(i, item)
+
+    def collect(self, out: List[ScheduledItem]) -> None:
+        """Appends every item of this subtree to `out`."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            out.extend(node.by_start)
+            if node.left is not None:
+                stack.append(node.left)
+            if node.right is not None:
+                stack.append(node.right)
+
+
+def _center_of(item: ScheduledItem) -> int:
+    return item._start_ns + (item._end_ns - item._start_ns) // 2
+
+
+def _build_interval_tree(items: List[ScheduledItem]) -> Optional[_IntervalNode]:
+    """Builds a balanced tree from items sorted by start time."""
+    if not items:
+        return None
+    node = _IntervalNode(_center_of(items[len(items) // 2]))
+    center = node.center
+    left: List[ScheduledItem] = []
+    right: List[ScheduledItem] = []
+    for item in items:
+        if item._end_ns <= center:
+            left.append(item)
+        elif item._start_ns > center:
+            right.append(item)
+        else:
+            node.by_start.append(item)
+    node.start_keys = array("q", [item._start_ns for item in node.by_start])
+    node.by_end = sorted(node.by_start, key=_end_key)
+    node.end_keys = array("q", [item._end_ns for item in node.by_end])
+    node.size = len(items)
+    node.min_start = items[0]._start_ns
+    node.max_end = node.end_keys[-1]
+    if left:
+        node.left = _build_interval_tree(left)
+    if right:
+        node.right = _build_interval_tree(right)
+        node.max_end = max(node.max_end, node.right.max_end)
+    return node
+
+
+# Weight-balance factor of the interval tree: a subtree is rebuilt once one of
+# its children holds more than this share of its items (scapegoat rebalancing).
+_TREE_BALANCE = 0.7
+_LOG_INV_BALANCE = math.log(1 / _TREE_BALANCE)
+
+
+def _query_bounds(query_start_time: datetime, query_end_time: datetime) -> Tuple[int, int]:
+    """Validates an overlap query range and converts it to epoch nanoseconds."""
+    if query_start_time.tzinfo is None or query_end_time.tzinfo is None:
+        raise ValueError("Query times must be timezone-aware.")
+    if query_end_time <= query_start_time:
+        raise ValueError("Query end_time must be after query start_time.")
+    return to_epoch_ns(query_start_time), to_epoch_ns(query_end_time)
+
+
 class ScheduleTimeline:
     """
     Represents a timeline holding scheduled activities, kept sorted by start time.
 
     Provides methods to add items and efficiently query for overlapping items.
+    Overlap queries on larger timelines go through a centered interval tree,
+    so they cost O(log n + k) instead of a scan of every earlier item.
     """
     def __init__(self):
         """Initializes an empty schedule timeline."""
-        self._items: List[ScheduledItem] = []
+        # SortedKeyList keeps inserts at O(log N) instead of the O(N) element
+        # shifting of a plain list, so incremental builds stay near-linear.
+        self._items: SortedKeyList = SortedKeyList(key=_timeline_key)
+        # Centered interval tree indexing the same items
+        self._root: Optional[_IntervalNode] = None
+        # Bumped on every mutation; part of the query cache key, so cached
+        # results from before a change are never returned.
+        self._version = 0
+        self._query_cache: OrderedDict = OrderedDict()
 
     def add_item(self, item: ScheduledItem) -> None:
         """
@@ -91,8 +240,98 @@ class ScheduleTimeline:
         """
         if not isinstance(item, ScheduledItem):
             raise TypeError("Can only add ScheduledItem objects to the timeline.")
-        # bisect.insort maintains sorted order efficiently
-        bisect.insort_left(self._items, item)
+        self._items.add(item)
+        self._index_item(item)
+        self._version += 1
+
+    @classmethod
+    def from_items(cls, items: Iterable[ScheduledItem]) -> 'ScheduleTimeline':
+        """
+        Builds a timeline from many items at once.
+
+        Sorts once and builds a balanced index in one pass, which is much
+        cheaper than calling add_item for each item.
+
+        Args:
+            items: The ScheduledItems to place on the new timeline.
+        """
+        timeline = cls()
+        timeline.extend(items)
+        return timeline
+
+    def extend(self, items: Iterable[ScheduledItem]) -> None:
+        """
+        Adds several ScheduledItems to the timeline.
+
+        Args:
+            items: The ScheduledItems to add.
+        """
+        new_items = list(items)
+        if not all(isinstance(item, ScheduledItem) for item in new_items):
+            raise TypeError("Can only add ScheduledItem objects to the timeline.")
+        if not new_items:
+            return
+        self._items.update(new_items)
+        if len(new_items) * 4 < len(self._items):
+            # A small batch: cheaper to insert than to rebuild the whole index
+            for item in new_items:
+                self._index_item(item)
+        else:
+            self._root = _build_interval_tree(list(self._items))
+        self._version += 1
+
+    def _index_item(self, item: ScheduledItem) -> None:
+        """Inserts an item into the interval tree, rebalancing it when it grows too deep."""
+        if self._root is None:
+            self._root = _IntervalNode(_center_of(item))
+        path: List[_IntervalNode] = []
+        node = self._root
+        while True:
+            node.size += 1
+            if item._start_ns < node.min_start:
+                node.min_start = item._start_ns
+            if item._end_ns > node.max_end:
+                node.max_end = item._end_ns
+            path.append(node)
+            center = node.center
+            if item._end_ns <= center:
+                child = node.left
+            elif item._start_ns > center:
+                child = node.right
+            else:
+                node.add(item)
+                return
+            if child is None:
+                break
+            node = child
+
+        leaf = _IntervalNode(_center_of(item))
+        leaf.add(item)
+        leaf.size = 1
+        leaf.min_start = item._start_ns
+        leaf.max_end = item._end_ns
+        if item._end_ns <= node.center:
+            node.left = leaf
+        else:
+            node.right = leaf
+        path.append(leaf)
+
+        # Appending in time order would otherwise grow a chain; rebuild the
+        # lowest ancestor whose subtree has become lopsided.
+        if len(path) > math.log(self._root.size) / _LOG_INV_BALANCE + 1:
+            for i in range(len(path) - 2, -1, -1):
+                if path[i + 1].size > _TREE_BALANCE * path[i].size:
+                    items: List[ScheduledItem] = []
+                    path[i].collect(items)
+                    items.sort(key=_timeline_key)
+                    rebuilt = _build_interval_tree(items)
+                    if i == 0:
+                        self._root = rebuilt
+                    elif path[i - 1].left is path[i]:
+                        path[i - 1].left = rebuilt
+                    else:
+                        path[i - 1].right = rebuilt
+                    return
 
     def find_overlapping_items(self, query_start_time: datetime, query_end_time: datetime) -> List[ScheduledItem]:
         """
@@ -106,41 +345,114 @@ class ScheduleTimeline:
             query_end_time: The end time of the query range (timezone-aware).
 
         Returns:
-            A list of ScheduledItem objects that overlap with the query range.
+            A list of ScheduledItem objects that overlap with the query range,
+            in timeline order.
 
         Raises:
             ValueError: If query times are not timezone-aware or end <= start.
         """
-        if query_start_time.tzinfo is None or query_end_time.tzinfo is None:
-            raise ValueError("Query times must be timezone-aware.")
-        if query_end_time <= query_start_time:
-            raise ValueError("Query end_time must be after query start_time.")
+        query_start_ns, query_end_ns = _query_bounds(query_start_time, query_end_time)
+
+        # Schedulers tend to probe the same windows repeatedly
+        cache_key = (query_start_ns, query_end_ns, self._version)
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            self._query_cache.move_to_end(cache_key)
+            return list(cached)
+
+        overlapping_items = self._collect_overlaps(query_start_ns, query_end_ns)
+        self._query_cache[cache_key] = tuple(overlapping_items)
+        if len(self._query_cache) > _QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+        return overlapping_items
 
-        overlapping_items: List[ScheduledItem] = []
+    def intersects_any(self, query_start_time: datetime, query_end_time: datetime) -> bool:
+        """
+        Tells whether any item overlaps the given query time range.
+
+        Uses the same overlap definition as find_overlapping_items but stops at
+        the first hit instead of collecting every overlapping item.
 
-        # Optimization: Find potential start index using bisect_left.
-        # We are looking for items whose end_time might be after the query_start_time.
-        # Since the list is sorted by start_time, we can't directly bisect for end_time.
-        # However, we can iterate starting from items whose start_time is potentially before query_end_time.
-        # Create a dummy item to find the insertion point for query_end_time start.
-        # Any item starting at or after this point cannot overlap with query_start_time.
-        potential_end_index_marker = ScheduledItem(query_end_time, query_end_time + timedelta(microseconds=1), None)
-        potential_end_index = bisect.bisect_left(self._items, potential_end_index_marker)
-
-        # Iterate through relevant portion of the list
-        for i in range(potential_end_index):
-            item = self._items[i]
-            # Check for overlap:
-            # Condition 1: Item must start before the query ends (item.start_time < query_end_time)
-            # Condition 2: Item must end after the query starts (item.end_time > query_start_time)
-            if item.start_time < query_end_time and item.end_time > query_start_time:
-                overlapping_items.append(item)
+        Raises:
+            ValueError: If query times are not timezone-aware or end <= start.
+        """
+        query_start_ns, query_end_ns = _query_bounds(query_start_time, query_end_time)
+
+        if len(self._items) < _LINEAR_SCAN_THRESHOLD:
+            potential_end_index = self._items.bisect_key_left((query_end_ns,))
+            return any(item._end_ns > query_start_ns for item in self._items.islice(0, potential_end_index))
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None or node.max_end <= query_start_ns or node.min_start >= query_end_ns:
+                continue
+            center = node.center
+            if query_end_ns <= center:
+                if node.start_keys[0] < query_end_ns:
+                    return True
+                stack.append(node.left)
+            elif query_start_ns >= center:
+                if node.end_keys[-1] > query_start_ns:
+                    return True
+                stack.append(node.right)
+            else:
+                # Nodes are never empty, and the query contains their center
+                return True
+        return False
+
+    def _collect_overlaps(self, query_start_ns: int, query_end_ns: int) -> List[ScheduledItem]:
+        if len(self._items) < _LINEAR_SCAN_THRESHOLD:
+            # Items starting at or after query_end_time cannot overlap, so only
+            # the prefix before that point needs to be scanned. The one-element
+            # key tuple sorts before every (query_end_time, end) key.
+            potential_end_index = self._items.bisect_key_left((query_end_ns,))
+            return [item for item in self._items.islice(0, potential_end_index)
+                    if item._end_ns > query_start_ns]
 
+        overlapping_items: List[ScheduledItem] = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            # Skip subtrees lying entirely before or after the query
+            if node is None or node.max_end <= query_start_ns or node.min_start >= query_end_ns:
+                continue
+            center = node.center
+            if query_end_ns <= center:
+                # Node items all end after the center, hence after the query
+                # start; they overlap iff they start before the query ends.
+                overlapping_items.extend(node.by_start[:bisect.bisect_left(node.start_keys, query_end_ns)])
+                stack.append(node.left)
+            elif query_start_ns >= center:
+                # Node items all start before the query; they overlap iff they
+                # end after the query starts.
+                overlapping_items.extend(node.by_end[bisect.bisect_right(node.end_keys, query_start_ns):])
+                stack.append(node.right)
+            else:
+                # The query contains the center, and so overlaps every node item.
+                overlapping_items.extend(node.by_start)
+                stack.append(node.left)
+                stack.append(node.right)
+
+        overlapping_items.sort(key=_timeline_key)
         return overlapping_items
 
-    def get_all_items(self) -> List[ScheduledItem]:
-        """Returns a copy of all items currently on the timeline."""
-        return list(self._items) # Return a copy to prevent external modification
+    def get_all_items(self) -> Tuple[ScheduledItem, ...]:
+        """
+        Returns an immutable snapshot of all items currently on the timeline.
+
+        Callers that only need to read the items should iterate the timeline
+        directly, which avoids the copy.
+        """
+        return tuple(self._items)
+
+    def __iter__(self) -> Iterator[ScheduledItem]:
+        """Iterates over the items in order. The timeline must not be modified meanwhile."""
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> ScheduledItem:
+        """Returns the item at `index` in timeline order."""
+        return self._items[index]
 
     def __len__(self) -> int:
         """Returns the number of items on the timeline."""
@@ -156,20 +468,7 @@ if __name__ == '__main__':
     from datetime import timedelta
     from zoneinfo import ZoneInfo # Python 3.9+
 
-    # Assume models.py exists and defines MustDoActivity
-    try:
-        from models import MustDoActivity, PriorityLevel
-    except ImportError:
-        # Define dummy MustDoActivity if models.py is not available
-        class PriorityLevel: HIGH="HIGH"
-        class MustDoActivity:
-            def __init__(self, title, start_time, end_time, priority):
-                self.title = title
-                self.start_time = start_time
-                self.end_time = end_time
-                self.priority = priority
-            def __repr__(self): return f"DummyMustDo(title='{self.title}')"
-
+    from models import MustDoActivity, PriorityLevel
 
     tz = ZoneInfo("Europe/Paris")
     now = datetime.now(tz).replace(minute=0, second=0, microsecond=0)
@@ -194,7 +493,7 @@ if __name__ == '__main__':
     timeline.add_item(item3) # Added out of order
 
     print("--- Timeline Items (Sorted) ---")
-    for item in timeline.get_all_items():
+    for item in timeline:
         print(item)
     print("-" * 20)
 
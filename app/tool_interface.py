@@ -1,9 +1,12 @@
 # app/tool_interface.py
 
+import functools
+import json
 import logging
+from dataclasses import dataclass
 from datetime import time
-from enum import Enum
 from typing import Optional, List, Dict, Any, Tuple
+from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field, ConfigDict
 
@@ -12,15 +15,8 @@ from models import UserPreferences, DayOfWeek
 from calendar_client import AbstractCalendarClient
 # Assuming gemini_interface.py defines FunctionCall
 from gemini_interface import FunctionCall
-
-# --- Enums ---
-
-class ToolResultStatus(str, Enum):
-    """Indicates the outcome of a tool execution."""
-    SUCCESS = "success"
-    ERROR = "error"
-    CLARIFICATION_NEEDED = "clarification_needed"
-
+# ToolResultStatus is defined once, in gemini_interface, and re-exported here
+from gemini_interface import ToolResultStatus
 
 # --- Data Structures (Task 5.2, 5.3) ---
 
@@ -36,23 +32,51 @@ class ExecutionContext(BaseModel):
     # Add other context if needed, e.g., access to WantToDo list, database connection
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
+    @functools.cached_property
+    def user_tz(self) -> ZoneInfo:
+        """
+        The user's timezone, resolved once per context and shared by every tool call.
+
+        Raises:
+            ZoneInfoNotFoundError/ValueError: If preferences.time_zone is not a valid IANA name.
+        """
+        return ZoneInfo(self.preferences.time_zone)
+
+    @functools.cached_property
+    def preferences_fingerprint(self) -> str:
+        """
+        The preferences serialized to JSON, computed once per context. Caches of
+        preference-dependent results key on it, so a preferences change misses them.
+        """
+        return self.preferences.model_dump_json()
 
-class ExecutorToolResult(BaseModel):
+
+@dataclass(frozen=True, slots=True)
+class ExecutorToolResult:
     """
     Represents the result returned by the Tool Executor after attempting
     to execute a function call. This structure is used internally before
     potentially being formatted for Gemini history (see ToolResult in gemini_interface.py).
+
+    Only ever built by our own wrappers, so it is a plain dataclass rather
+    than a Pydantic model: no validation runs on construction.
     """
-    name: str = Field(..., description="The name of the function that was attempted.")
-    status: ToolResultStatus = Field(..., description="The outcome status of the execution attempt.")
+    name: str  # The name of the function that was attempted.
+    status: ToolResultStatus  # The outcome status of the execution attempt.
     # Flexible dictionary for successful results or structured error/clarification data
-    result: Optional[Dict[str, Any]] = Field(None, description="Dictionary containing successful execution results (e.g., event details) or structured data for other statuses.")
-    error_details: Optional[str] = Field(None, description="Detailed error message if status is 'error'.")
-    clarification_prompt: Optional[str] = Field(None, description="Suggested prompt/question to ask the user if status is 'clarification_needed'.")
-
-    class Config:
-        # Allow arbitrary types for calendar_client (though AbstractCalendarClient is preferred)
-        arbitrary_types_allowed = True
+    result: Optional[Dict[str, Any]] = None
+    error_details: Optional[str] = None  # Detailed error message if status is 'error'.
+    clarification_prompt: Optional[str] = None  # Question to ask the user if status is 'clarification_needed'.
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns a JSON-friendly dict, e.g. for persistence or logging."""
+        return {
+            "name": self.name,
+            "status": ToolResultStatus(self.status).value,
+            "result": self.result,
+            "error_details": self.error_details,
+            "clarification_prompt": self.clarification_prompt,
+        }
 
 
 # --- Interface Function Signature (Conceptual - Task 5.1) ---
@@ -130,7 +154,7 @@ if __name__ == '__main__':
     )
 
     print("\n--- ExecutorToolResult Examples ---")
-    print("Success:", result_success.model_dump_json(indent=2))
-    print("Error:", result_error.model_dump_json(indent=2))
-    print("Clarification:", result_clarify.model_dump_json(indent=2))
+    print("Success:", json.dumps(result_success.to_dict(), indent=2, default=str))
+    print("Error:", json.dumps(result_error.to_dict(), indent=2, default=str))
+    print("Clarification:", json.dumps(result_clarify.to_dict(), indent=2, default=str))
 
@@ -1,14 +1,19 @@
 # app/tool_wrappers.py
 
+import asyncio
+import functools
 import logging
+import threading
+import time as _time
+from collections import OrderedDict
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta, time, date
-from typing import Dict, Any, Optional, List, Tuple
-from pydantic import (BaseModel, Field, field_validator,
-                      model_validator)
-import pytz # For timezone handling
-from dateutil.parser import parse as dateutil_parse # For flexible datetime parsing
-from pydantic import BaseModel, ValidationError, Field, field_validator
+from itertools import groupby
+from operator import attrgetter
+from types import MappingProxyType
+from datetime import datetime, timedelta, time, date, timezone
+from typing import Dict, Any, Optional, List, Tuple, Mapping
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator, model_validator
+from zoneinfo import ZoneInfo
 from googleapiclient.errors import HttpError
 
 # Attempt to import dependent models and interfaces
@@ -16,17 +21,92 @@ from tool_interface import ExecutionContext, ExecutorToolResult, ToolResultStatu
 # Core models from Task 1
 from models import WantToDoActivity, TimeSlot, ActivityCategory, ActivityStatus, UserPreferences, DayOfWeek, EnergyLevel
 # Core logic functions (conceptual imports)
-from scheduler_logic import schedule_want_to_do_basic, ConflictInfo # Need ConflictInfo if handling conflicts here
+from scheduler_logic import ConflictInfo, schedule_single # Need ConflictInfo if handling conflicts here
+from timeline import ScheduledItem, ScheduleTimeline
 # Calendar client interface (needed from context)
 from calendar_client import AbstractCalendarClient, GoogleCalendarAPIClient
 
+logger = logging.getLogger(__name__)
+
+# Enum names accepted by the args validators, and their error messages, built once at import.
+# The category validators upper-case category_str, so it indexes _CATEGORY_MAP directly.
+_CATEGORY_MAP: Mapping[str, ActivityCategory] = MappingProxyType(dict(ActivityCategory.__members__))
+_INVALID_CATEGORY_MSG = f"Invalid category. Choose from: {list(ActivityCategory.__members__)}"
+_STATUS_NAMES = frozenset(ActivityStatus.__members__)
+_INVALID_STATUS_MSG = f"Invalid status. Choose from: {list(ActivityStatus.__members__)}"
+
+# Free slots for the flexible-scheduling window, keyed by (user_id, window start date, tz name,
+# preferences fingerprint).
+# Back-to-back scheduling requests reuse them instead of re-querying the calendar; any
+# calendar write made through these wrappers evicts the user's overlapping entries.
+# Wrappers run on worker threads (see ToolWrapper.arun), so every access holds
+# _AVAIL_LOCK; the cache is an LRU capped at _AVAIL_MAX_ENTRIES. Entries are per process and
+# may miss writes made elsewhere, so a slot picked from them is re-checked before booking.
+_AVAIL_TTL_S = 60.0
+_AVAIL_WINDOW = timedelta(days=7)
+_AVAIL_MAX_ENTRIES = 1024
+_AVAIL_CACHE: "OrderedDict[Tuple[str, date, str, str], Tuple[float, List[TimeSlot]]]" = OrderedDict()
+_AVAIL_LOCK = threading.Lock()
+
+
+def _cached_available_slots(context: ExecutionContext, query_start: datetime, query_end: datetime) -> List[TimeSlot]:
+    """Returns the free slots for the window, from the cache when fresh."""
+    key = (context.user_id, query_start.date(), context.preferences.time_zone, context.preferences_fingerprint)
+    with _AVAIL_LOCK:
+        entry = _AVAIL_CACHE.get(key)
+        if entry is not None:
+            if entry[0] > _time.monotonic():
+                _AVAIL_CACHE.move_to_end(key)
+                return entry[1]
+            del _AVAIL_CACHE[key]
+    # Fetched outside the lock so one slow calendar call does not block other users
+    slots = context.calendar_client.get_available_time_slots(
+        calendar_id='primary', # Assuming primary for now
+        preferences=context.preferences,
+        start_time=query_start,
+        end_time=query_end,
+    )
+    now = _time.monotonic()
+    with _AVAIL_LOCK:
+        for expired in [k for k, (expires_at, _) in _AVAIL_CACHE.items() if expires_at <= now]:
+            del _AVAIL_CACHE[expired]
+        _AVAIL_CACHE[key] = (now + _AVAIL_TTL_S, slots)
+        _AVAIL_CACHE.move_to_end(key)
+        while len(_AVAIL_CACHE) > _AVAIL_MAX_ENTRIES:
+            _AVAIL_CACHE.popitem(last=False)
+    return slots
+
+
+def _invalidate_available_slots(user_id: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> None:
+    """
+    Evicts the user's cached windows overlapping [start, end], or all of them if no range is given.
+
+    Called right after a calendar write has succeeded, so it never raises: a failure
+    here is logged rather than reported as a failed write.
+    """
+    try:
+        first_day = start.date() if start is not None else None
+        last_day = end.date() if end is not None else None
+        with _AVAIL_LOCK:
+            for key in [key for key in _AVAIL_CACHE if key[0] == user_id]:
+                window_first, window_last = key[1], key[1] + _AVAIL_WINDOW
+                if (last_day is None or window_first <= last_day) and (first_day is None or window_last >= first_day):
+                    del _AVAIL_CACHE[key]
+    except Exception:
+        logger.exception("Could not evict cached availability for user %s", user_id)
+
 # --- Abstract Base Class for Tool Wrappers (Task 6.1) ---
 
 class ToolWrapper(ABC):
     """
     Abstract Base Class for all tool wrappers.
     Defines the interface for the Tool Executor to interact with specific tool logic.
+    Wrappers are stateless: one shared instance per tool serves every request,
+    possibly from several threads at once (see arun), so they must be reentrant.
+    Subclasses declare empty __slots__ to keep it that way.
     """
+    __slots__ = ()
+
     tool_name: str # Subclasses should define the tool name they handle
     description: str = Field(..., description="Description of the tool.")
     parameters_schema: Dict[str, Any] = Field(
@@ -49,6 +129,13 @@ class ToolWrapper(ABC):
         """
         pass
 
+    async def arun(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
+        """
+        Async variant of run() for use from the event loop.
+        The calendar clients are blocking, so by default run() is executed in a worker thread.
+        """
+        return await asyncio.to_thread(self.run, args, context)
+
     def _create_success_result(self, result_data: Dict[str, Any]) -> ExecutorToolResult:
         """Helper to create a success result."""
         return ExecutorToolResult(name=self.tool_name, status=ToolResultStatus.SUCCESS, result=result_data)
@@ -64,10 +151,15 @@ class ToolWrapper(ABC):
 
 # --- Argument Parsing Utilities ---
 
-def parse_datetime_flexible(dt_str: str, user_tz: pytz.BaseTzInfo) -> Optional[datetime]:
+# dateutil.parser is only needed for non-ISO strings, so it is imported on first use
+_dateutil_parse = None
+
+def parse_datetime_flexible(dt_str: str, user_tz: ZoneInfo) -> Optional[datetime]:
     """
-    Parses a date/time string using dateutil.parser and makes it timezone-aware.
-    Handles relative terms like "tomorrow", "next Tuesday 3pm".
+    Parses a date/time string and makes it timezone-aware.
+    ISO 8601 strings take the datetime.fromisoformat fast path; anything else
+    (e.g. "tomorrow", "next Tuesday 3pm") falls back to dateutil.parser.
+    Results are memoized, since Gemini tends to repeat the same strings within a session.
 
     Args:
         dt_str: The date/time string from Gemini.
@@ -78,34 +170,91 @@ def parse_datetime_flexible(dt_str: str, user_tz: pytz.BaseTzInfo) -> Optional[d
     """
     if not dt_str:
         return None
+    # dateutil fills in missing date parts from today, so today is part of the cache key
+    return _parse_datetime_cached(dt_str, user_tz, date.today())
+
+def parse_datetimes_flexible(dt_strs: Tuple[Optional[str], ...], user_tz: ZoneInfo) -> Tuple[Optional[datetime], ...]:
+    """
+    Parses several date/time strings at once, e.g. a tool's start, end and deadline.
+    Same rules as parse_datetime_flexible, with today's date read once for the batch.
+    """
+    today = date.today()
+    return tuple(_parse_datetime_cached(dt_str, user_tz, today) if dt_str else None for dt_str in dt_strs)
+
+@functools.lru_cache(maxsize=1024)
+def _parse_datetime_cached(dt_str: str, user_tz: ZoneInfo, today: date) -> Optional[datetime]:
     try:
-        # fuzzy=True might be too lenient, consider False first
-        dt_naive = dateutil_parse(dt_str, fuzzy=False)
+        dt_naive = None
+        # Gemini usually sends ISO timestamps; fromisoformat is much cheaper than dateutil.
+        # A string that doesn't open with a four-digit year can't be ISO, so skip the attempt and its exception.
+        if dt_str[:4].isdigit():
+            try:
+                dt_naive = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
+            except ValueError:
+                pass
+        if dt_naive is None:
+            global _dateutil_parse
+            if _dateutil_parse is None:
+                from dateutil.parser import parse as _dateutil_parse
+            # fuzzy=True might be too lenient, consider False first
+            dt_naive = _dateutil_parse(dt_str, fuzzy=False)
         # If parsing yields only a date, assume start of day? Or require time?
         # For now, assume parser gets time if specified.
         # Make the parsed datetime timezone-aware using user's timezone
         if dt_naive.tzinfo is None:
-            dt_aware = user_tz.localize(dt_naive, is_dst=None)  # Make it timezone-aware
+            # Ambiguous/missing wall times resolve via PEP 495 fold (fold=0: the earlier offset)
+            dt_aware = dt_naive.replace(tzinfo=user_tz)  # Make it timezone-aware
         else:
-            dt_aware = dt_naive.astimezone(user_tz)  # Convert to the user's timezone # is_dst=None handles ambiguity
+            dt_aware = dt_naive.astimezone(user_tz)  # Convert to the user's timezone
         return dt_aware
     except (ValueError, OverflowError, TypeError) as e:
-        logging.getLogger(__name__).warning(f"Could not parse datetime string '{dt_str}': {e}")
+        logger.warning("Could not parse datetime string '%s': %s", dt_str, e)
         return None
 
-def parse_timedelta_minutes(minutes: Optional[int]) -> Optional[timedelta]:
-    """Parses duration in minutes to timedelta."""
-    if minutes is None or minutes <= 0:
-        return None
-    try:
-        return timedelta(minutes=int(minutes))
-    except (ValueError, TypeError):
-        return None
+def _parse_rfc3339(value: str) -> datetime:
+    """Parses a Google Calendar RFC 3339 timestamp (which may end in 'Z')."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+@functools.lru_cache(maxsize=64)
+def _preferred_minutes_mask(windows: Tuple[Tuple[time, time], ...]) -> int:
+    """
+    Compiles preferred time windows into a 1440-bit mask: bit i is set when minute i
+    of the day lies wholly inside one of the windows. Cached per distinct window set.
+    """
+    mask = 0
+    for window_start, window_end in windows:
+        # Round the window inwards to whole minutes
+        first = window_start.hour * 60 + window_start.minute + bool(window_start.second or window_start.microsecond)
+        last = window_end.hour * 60 + window_end.minute
+        if last > first:
+            mask |= ((1 << (last - first)) - 1) << first
+    return mask
+
+def _within_preferred_minutes(mask: int, start: datetime, end: datetime) -> bool:
+    """True if every minute [start, end) touches is preferred; a single shift-and-compare on the mask."""
+    first = start.hour * 60 + start.minute
+    # Round the end outwards; an end at midnight the next day closes the day at minute 1440
+    last = end.hour * 60 + end.minute + bool(end.second or end.microsecond)
+    if end.date() != start.date():
+        if last or end.date() - start.date() != timedelta(days=1):
+            return False
+        last = 1440
+    needed = (1 << (last - first)) - 1
+    return (mask >> first) & needed == needed
 
 # --- Concrete Tool Wrapper Implementation (Task 6.2) ---
 
 class ScheduleActivityWrapperArgs(BaseModel):
     """Input validation model for schedule_activity arguments."""
+    # Assignment validation and instance revalidation are spelled out so they stay off
+    model_config = ConfigDict(
+        extra='ignore',
+        frozen=True,
+        str_strip_whitespace=True,
+        validate_assignment=False,
+        revalidate_instances='never',
+    )
+
     title: str = Field(..., description="The title of the task or event.")
     description: str = Field(..., description="The description of the task or event.")
     start_time_str: Optional[str] = Field(None, description="Requested start time (e.g., 'tomorrow 9am', '2025-05-10 14:00').")
@@ -119,18 +268,28 @@ class ScheduleActivityWrapperArgs(BaseModel):
     @classmethod
     def check_category(cls, v: Optional[str]):
         """Validate if the category string matches enum values (case-insensitive)."""
-        if v and v.upper() not in ActivityCategory.__members__:
-            raise ValueError(f"Invalid category. Choose from: {list(ActivityCategory.__members__.keys())}")
-        return v
+        if v and v.upper() not in _CATEGORY_MAP:
+            raise ValueError(_INVALID_CATEGORY_MSG)
+        return v.upper() if v else v  # Normalized, so callers can index _CATEGORY_MAP directly
 
 class ScheduleActivityWrapper(ToolWrapper):
     """
     Wrapper for the 'schedule_activity' tool.
     Handles parsing arguments, calling core scheduling logic, and formatting results.
     """
+    __slots__ = ()
+
     tool_name = "schedule_activity"
     logger = logging.getLogger(__name__)
     description = "Schedules an activity based on user preferences and calendar availability."
+
+    # Responses with fixed text are built once; ExecutorToolResult is frozen, so sharing them is safe
+    _NEED_CATEGORY_RESULT = ExecutorToolResult(
+        name=tool_name, status=ToolResultStatus.CLARIFICATION_NEEDED,
+        clarification_prompt="Please specify a category (e.g., WORK, PERSONAL) for this task.")
+    _INSUFFICIENT_INFO_RESULT = ExecutorToolResult(
+        name=tool_name, status=ToolResultStatus.CLARIFICATION_NEEDED,
+        clarification_prompt="Please provide at least a duration, or specific start/end times for the activity.")
     parameters_schema = {
       "type": "object",
       "properties": {
@@ -181,29 +340,23 @@ class ScheduleActivityWrapper(ToolWrapper):
         context: ExecutionContext
     ) -> ExecutorToolResult:
         """Handles scheduling when specific start and end times are provided."""
-        self.logger.info(f"Handling fixed time schedule request: '{title}' from {start_time} to {end_time}")
+        log = self.logger
+        log.info("Handling fixed time schedule request: '%s' from %s to %s", title, start_time, end_time)
 
         try:
             # 1. Check for conflicts directly on the calendar
-            # We check for *any* busy slot within the exact requested time frame.
-            # We assume get_busy_slots returns events that *overlap* the given range.
-            # We need to be careful about events ending exactly when the new one starts, or vice-versa.
-            # Let's check for busy slots slightly within the range to avoid boundary issues.
-            check_start = start_time + timedelta(microseconds=1)
-            check_end = end_time - timedelta(microseconds=1)
-
-            # Ensure check range is valid if duration is very short
-            if check_start >= check_end:
-                 check_start = start_time
-                 check_end = end_time
-
-            self.logger.debug(f"Checking for conflicts between {check_start} and {check_end}")
+            # Intervals are half-open, [start, end): a busy block ending exactly at
+            # start_time (or starting at end_time) is adjacent, not a conflict.
             # Get busy slots from the calendar client : make method call async later
-            conflicting_busy_slots = context.calendar_client.get_busy_slots(
+            busy_slots = context.calendar_client.get_busy_slots(
                 calendar_id='primary', # Assuming primary for now
-                start_time=check_start,
-                end_time=check_end
+                start_time=start_time,
+                end_time=end_time
             )
+            # Index the busy slots by time and keep only those that really overlap the
+            # request, so formatting below only touches actual conflicts
+            busy_index = ScheduleTimeline.from_items(ScheduledItem(slot.start_time, slot.end_time, slot) for slot in busy_slots)
+            conflicting_busy_slots = [item.activity_obj for item in busy_index.find_overlapping_items(start_time, end_time)]
 
             if conflicting_busy_slots:
                 # Conflict detected
@@ -211,11 +364,11 @@ class ScheduleActivityWrapper(ToolWrapper):
                                             for slot in conflicting_busy_slots if hasattr(slot, 'activity_obj')]) # Check if dummy slots have activity_obj
                 if not conflict_details: conflict_details = f"{len(conflicting_busy_slots)} existing event(s)" # Fallback message
                 error_msg = f"Cannot schedule '{title}' at the requested time because it conflicts with: {conflict_details}."
-                self.logger.warning(error_msg)
+                log.warning(error_msg)
                 return self._create_error_result(error_msg, result_data={"conflicts": [str(s) for s in conflicting_busy_slots]}) # Pass conflict details if needed
 
             # 2. No conflict, add the event to the calendar
-            self.logger.info(f"No conflicts found. Adding event '{title}' to calendar.")
+            log.info("No conflicts found. Adding event '%s' to calendar.", title)
             # Conceptual call - AbstractCalendarClient needs an add_event method
             created_event_details = context.calendar_client.add_event(
                 title=title,
@@ -224,8 +377,9 @@ class ScheduleActivityWrapper(ToolWrapper):
                 description=description
                 # Potentially add attendees, location etc. if provided in args
             )
+            _invalidate_available_slots(context.user_id, start_time, end_time)
 
-            self.logger.info(f"Event added successfully: {created_event_details}")
+            log.info("Event added successfully: %s", created_event_details)
             return self._create_success_result({
                 "message": f"OK. Scheduled '{title}'.",
                 "event_id": created_event_details.get("id"),
@@ -235,153 +389,167 @@ class ScheduleActivityWrapper(ToolWrapper):
             })
 
         except Exception as e:
-            self.logger.exception(f"Error during fixed-time scheduling for '{title}': {e}")
+            log.exception("Error during fixed-time scheduling for '%s': %s", title, e)
             return self._create_error_result(f"An internal error occurred while scheduling the fixed-time event: {e}")
 
 
 
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        log = self.logger
+        log.info("Running %s with args: %s", self.tool_name, args)
 
         # 1. Validate arguments using Pydantic model
         try:
-            validated_args = ScheduleActivityWrapperArgs(**args)
-            self.logger.debug("Arguments validated successfully.")
+            validated_args = ScheduleActivityWrapperArgs.model_validate(args)
+            log.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
-            error_msg = f"Invalid arguments provided for scheduling: {e.errors()}"
-            clarification = f"I couldn't understand the details for scheduling. Please clarify: {e.errors()}"
-            return self._create_clarification_result(clarification, result_data={"validation_errors": e.errors()})
+            log.error("Argument validation failed: %s", e)
+            # e.errors() rebuilds the error list on every call, so build it once
+            errors = e.errors()
+            clarification = f"I couldn't understand the details for scheduling. Please clarify: {errors}"
+            return self._create_clarification_result(clarification, result_data={"validation_errors": errors})
 
         # 2. Convert simple types to domain types
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
         except Exception as e:
-             self.logger.error(f"Invalid timezone in user preferences: {context.preferences.time_zone} - {e}")
+             log.error("Invalid timezone in user preferences: %s - %s", context.preferences.time_zone, e)
              return self._create_error_result(f"Invalid timezone configuration found in your preferences: {context.preferences.time_zone}")
 
-        start_time: Optional[datetime] = parse_datetime_flexible(validated_args.start_time_str, user_tz)
-        end_time: Optional[datetime] = parse_datetime_flexible(validated_args.end_time_str, user_tz)
-        duration: Optional[timedelta] = parse_timedelta_minutes(validated_args.duration_minutes)
-        deadline: Optional[datetime] = parse_datetime_flexible(validated_args.deadline_str, user_tz)
-        category: Optional[ActivityCategory] = ActivityCategory(validated_args.category_str.upper()) if validated_args.category_str else None
-        description: Optional[str] = validated_args.description # Get description
+        start_time, end_time, deadline = parse_datetimes_flexible(
+            (validated_args.start_time_str, validated_args.end_time_str, validated_args.deadline_str), user_tz)
+        # duration_minutes is validated as a positive int, so it converts directly
+        duration: Optional[timedelta] = timedelta(minutes=validated_args.duration_minutes) if validated_args.duration_minutes else None
+        category: Optional[ActivityCategory] = _CATEGORY_MAP[validated_args.category_str] if validated_args.category_str else None
 
         # --- Logic to determine task parameters ---
+        # Pick the scenario from which of start/end/duration were given, as a 3-bit mask
+        scenario = (start_time is not None) << 2 | (end_time is not None) << 1 | (duration is not None)
+        handler = self._SCENARIO_HANDLERS.get(scenario, ScheduleActivityWrapper._request_more_details)
+        return handler(self, validated_args, start_time, end_time, duration, deadline, category, user_tz, context)
+
+    # All scenario handlers share one signature so run() can dispatch without branching
+    def _schedule_fixed_range(self, validated_args, start_time, end_time, duration, deadline, category, user_tz, context) -> ExecutorToolResult:
+        """Scenario 1: fixed start and end time provided."""
+        if end_time <= start_time:
+            return self._create_error_result("End time must be after start time.")
+        return self._handle_fixed_time_scheduling(
+            title=validated_args.title,
+            start_time=start_time,
+            end_time=end_time,
+            description=validated_args.description,
+            context=context
+        )
 
-        # Scenario 1: Fixed start and end time provided
-        if start_time and end_time:
-            if end_time <= start_time:
-                return self._create_error_result("End time must be after start time.")
-            # --- Call helper for fixed time scheduling ---
-            return self._handle_fixed_time_scheduling(
-                title=validated_args.title,
-                start_time=start_time,
-                end_time=end_time,
-                description=description,
-                context=context
-            )
+    def _schedule_start_plus_duration(self, validated_args, start_time, end_time, duration, deadline, category, user_tz, context) -> ExecutorToolResult:
+        """Scenario 2: start time and duration provided."""
+        return self._handle_fixed_time_scheduling(
+            title=validated_args.title,
+            start_time=start_time,
+            end_time=start_time + duration,
+            description=validated_args.description,
+            context=context
+        )
 
-        # Scenario 2: Start time and duration provided
-        elif start_time and duration:
-            calculated_end_time = start_time + duration
-            # --- Call helper for fixed time scheduling ---
-            return self._handle_fixed_time_scheduling(
-                title=validated_args.title,
-                start_time=start_time,
-                end_time=calculated_end_time,
-                description=description,
-                context=context
-            )
+    def _schedule_flexible(self, validated_args, start_time, end_time, duration, deadline, category, user_tz, context) -> ExecutorToolResult:
+        """Scenario 3: only a duration provided, find an available slot (core flexible scheduling)."""
+        description = validated_args.description
+        estimated_duration = duration
+        self.logger.info("Scheduling flexible task: duration %s", duration)
+        # This is the main path using our existing scheduler logic
+
+        if not category:
+            # Ask for category if flexible scheduling is requested without one
+            return self._NEED_CATEGORY_RESULT
+        priority = validated_args.priority or 5 # Default priority
+
+        # Every field was already validated in run() (positive duration, aware deadline,
+        # priority 1-10), so skip re-running WantToDoActivity's validators
+        activity_to_schedule = WantToDoActivity.model_construct(
+            title=validated_args.title,
+            description=description, # Pass description
+            estimated_duration=estimated_duration,
+            priority=priority,
+            category=category,
+            deadline=deadline,
+        )
 
-        # Scenario 3: Duration provided, find available slot (Core flexible scheduling)
-        elif duration:
-            estimated_duration = duration
-            self.logger.info(f"Scheduling flexible task: duration {duration}")
-            # This is the main path using our existing scheduler logic
+        # 3. Call core logic
+        try:
+            # 3a. Find a free slot (using Task 5 logic via calendar client)
+            # Do the range arithmetic in UTC (an absolute 7 days, even across a DST change),
+            # then hand the client the bounds in the user's timezone
+            now_utc = datetime.now(timezone.utc) # Or context-aware start
+            query_start = now_utc.astimezone(user_tz)
+            query_end = (now_utc + _AVAIL_WINDOW).astimezone(user_tz) # Configurable range
+            self.logger.info("Looking for a %s slot from %s to %s", estimated_duration, query_start, query_end)
+            # 3b. Place the activity at the start of the earliest slot with room (first fit).
+            # Slots may come from a cache filled up to a minute ago, so clip them to now and
+            # confirm the pick against live busy slots; on a clash, evict and pick again.
+            for attempt in range(2):
+                assigned_slot = schedule_single(
+                    activity_to_schedule, _cached_available_slots(context, query_start, query_end), not_before=query_start)
+                if assigned_slot is None or not self._slot_is_busy(context, assigned_slot):
+                    break
+                self.logger.warning("Cached slot %s - %s is no longer free; refreshing availability.",
+                                    assigned_slot.start_time, assigned_slot.end_time)
+                _invalidate_available_slots(context.user_id)
+            else:
+                return self._create_error_result(
+                    f"The calendar changed while scheduling '{activity_to_schedule.title}'. Please try again.")
+            if assigned_slot is None:
+                self.logger.warning("Could not schedule '%s' - no suitable slot found.", activity_to_schedule.title)
+                return self._create_error_result(f"Could not find a suitable time slot for '{activity_to_schedule.title}' with duration {activity_to_schedule.estimated_duration} in the next 7 days.")
 
-            if not category:
-                # Ask for category if flexible scheduling is requested without one
-                return self._create_clarification_result("Please specify a category (e.g., WORK, PERSONAL) for this task.")
-            priority = validated_args.priority or 5 # Default priority
+            scheduled_start = assigned_slot.start_time
+            scheduled_end = assigned_slot.end_time
+            activity_to_schedule.status = ActivityStatus.SCHEDULED
+            self.logger.info("Successfully scheduled '%s' at %s", activity_to_schedule.title, scheduled_start)
 
-            activity_to_schedule = WantToDoActivity(
-                title=validated_args.title,
-                description=description, # Pass description
-                estimated_duration=estimated_duration,
-                priority=priority,
-                category=category,
-                deadline=deadline,
+            # 4. Persist the scheduled event and format the result
+            created_event_details = context.calendar_client.add_event(
+                 title=activity_to_schedule.title,
+                 start_time=scheduled_start,
+                 end_time=scheduled_end,
+                 description=activity_to_schedule.description
             )
+            _invalidate_available_slots(context.user_id, scheduled_start, scheduled_end)
 
-            # 3. Call core logic
-            try:
-                # 3a. Get available slots (using Task 5 logic via calendar client)
-                query_start = datetime.now(user_tz) # Or context-aware start
-                query_end = query_start + timedelta(days=7) # Configurable range
-                self.logger.info(f"Fetching available slots from {query_start} to {query_end}")
-                # Ensure calendar_client is awaited if its methods are async
-                available_slots = context.calendar_client.get_available_time_slots(
-                    calendar_id='primary', # Assuming primary for now
-                    preferences=context.preferences,
-                    start_time=query_start,
-                    end_time=query_end
-                )
-                self.logger.info(f"Found {len(available_slots)} available slots matching preferences.")
-
-                if not available_slots:
-                     return self._create_error_result(f"No available time slots found in the next 7 days matching your preferences.")
-
-                # 3b. Run the basic scheduler (Task 4)
-                scheduled_map, unscheduled = schedule_want_to_do_basic(
-                    want_to_do_list=[activity_to_schedule],
-                    available_slots=available_slots
-                )
-
-                # 4. Format the result
-                if activity_to_schedule.id in scheduled_map:
-                    scheduled_slot = scheduled_map[activity_to_schedule.id]
-                    self.logger.info(f"Successfully scheduled '{activity_to_schedule.title}' at {scheduled_slot.start_time}")
-
-                    # TODO: Persist the scheduled event (e.g., add to Google Calendar via calendar_client, update task status in DB)
-                    # Example conceptual call:
-                    created_event_details = context.calendar_client.add_event(
-                         title=activity_to_schedule.title,
-                         start_time=scheduled_slot.start_time,
-                         end_time=scheduled_slot.end_time,
-                         description=activity_to_schedule.description
-                    )
-                    event_id = created_event_details.get("id")
-                    event_link = created_event_details.get("htmlLink")
-                    # Simulate success for now
-                    event_id = event_id
-                    event_link = event_link
-
-                    return self._create_success_result({
-                        "message": f"OK. Scheduled '{activity_to_schedule.title}'.",
-                        "activity_id": activity_to_schedule.id,
-                        "event_id": event_id, # Add event ID from calendar
-                        "event_link": event_link, # Add link from calendar
-                        "scheduled_start": scheduled_slot.start_time.isoformat(),
-                        "scheduled_end": scheduled_slot.end_time.isoformat(),
-                        "category": activity_to_schedule.category.value,
-                    })
-                else:
-                    self.logger.warning(f"Could not schedule '{activity_to_schedule.title}' - no suitable slot found.")
-                    return self._create_error_result(f"Could not find a suitable time slot for '{activity_to_schedule.title}' with duration {activity_to_schedule.estimated_duration}.")
-
-            except Exception as e:
-                self.logger.exception(f"Core logic execution failed: {e}")
-                return self._create_error_result(f"An internal error occurred while trying to schedule: {e}")
-
-        # Scenario 4: Insufficient information
-        else:
-            self.logger.warning("Insufficient information provided for scheduling.")
-            return self._create_clarification_result("Please provide at least a duration, or specific start/end times for the activity.")
-
+            return self._create_success_result({
+                "message": f"OK. Scheduled '{activity_to_schedule.title}'.",
+                "activity_id": activity_to_schedule.id,
+                "event_id": created_event_details.get("id"), # Add event ID from calendar
+                "event_link": created_event_details.get("htmlLink"), # Add link from calendar
+                "scheduled_start": scheduled_start.isoformat(),
+                "scheduled_end": scheduled_end.isoformat(),
+                "category": activity_to_schedule.category.value,
+            })
 
+        except Exception as e:
+            self.logger.exception("Core logic execution failed: %s", e)
+            return self._create_error_result(f"An internal error occurred while trying to schedule: {e}")
+
+    @staticmethod
+    def _slot_is_busy(context: ExecutionContext, slot: TimeSlot) -> bool:
+        """Whether a live busy block overlaps the half-open slot [start, end)."""
+        busy_slots = context.calendar_client.get_busy_slots(
+            calendar_id='primary', start_time=slot.start_time, end_time=slot.end_time)
+        return any(busy.start_time < slot.end_time and busy.end_time > slot.start_time for busy in busy_slots)
+
+    def _request_more_details(self, validated_args, start_time, end_time, duration, deadline, category, user_tz, context) -> ExecutorToolResult:
+        """Scenario 4: insufficient information."""
+        self.logger.warning("Insufficient information provided for scheduling.")
+        return self._INSUFFICIENT_INFO_RESULT
+
+    # Keyed on (has_start << 2 | has_end << 1 | has_duration); anything missing falls back to a clarification
+    _SCENARIO_HANDLERS = MappingProxyType({
+        0b111: _schedule_fixed_range,
+        0b110: _schedule_fixed_range,
+        0b101: _schedule_start_plus_duration,
+        0b011: _schedule_flexible,
+        0b001: _schedule_flexible,
+    })
 
-# --- Get Calendar Events Tool Wrapper ---
 
 class GetCalendarEventsWrapperArgs(BaseModel):
     """Input validation model for get_calendar_events arguments."""
@@ -393,6 +561,8 @@ class GetCalendarEventsWrapper(ToolWrapper):
     Wrapper for the 'get_calendar_events' tool.
     Retrieves planned events from the user's calendar for a specified time range.
     """
+    __slots__ = ()
+
     tool_name = "get_calendar_events"
     logger = logging.getLogger(__name__)
     description = "Retrieves upcoming events from the user's Google Calendar for a specified number of days."
@@ -413,23 +583,167 @@ class GetCalendarEventsWrapper(ToolWrapper):
         "required": []
     }
     
+    # Partial response: only the event fields _keep/_event_to_dict read
+    _LIST_FIELDS = (
+        "nextPageToken,items(id,summary,description,location,start,end,transparency,"
+        "attendees(email,displayName,responseStatus,organizer),recurringEventId)"
+    )
+
+    # Ranges longer than this are fetched as several windows in one batch request
+    _WINDOW = timedelta(days=7)
+
+    def _list_request(self, service, window_start: datetime, window_end: datetime, page_token: Optional[str]):
+        """Builds (without executing) one events.list page request."""
+        return service.events().list(
+            calendarId='primary',
+            timeMin=window_start.isoformat(),
+            timeMax=window_end.isoformat(),
+            singleEvents=True,
+            orderBy='startTime',
+            pageToken=page_token,
+            maxResults=250,
+            fields=self._LIST_FIELDS
+        )
+
+    @staticmethod
+    def _execute_batch(service, requests: Dict[int, Any]) -> Dict[int, Dict[str, Any]]:
+        """Runs the requests as one batch HTTP call and returns their responses by key."""
+        responses: Dict[int, Dict[str, Any]] = {}
+        errors: List[Exception] = []
+
+        def _collect(request_id: str, response: Optional[Dict[str, Any]], exception: Optional[Exception]) -> None:
+            if exception is not None:
+                errors.append(exception)
+            else:
+                responses[int(request_id)] = response
+
+        batch = service.new_batch_http_request(callback=_collect)
+        for key, request in requests.items():
+            batch.add(request, request_id=str(key))
+        batch.execute()
+        if errors:
+            raise errors[0]
+        return responses
+
+    def _fetch_events(self, service, start_time: datetime, end_time: datetime) -> List[Dict[str, Any]]:
+        """
+        Lists the raw events in [start_time, end_time) in start order.
+
+        The range is split into weekly windows whose pages are fetched together,
+        one batch request per round, so a long range costs the round trips of its
+        busiest week instead of one per page. An event spanning a window boundary
+        is listed by both windows and kept once.
+        """
+        windows = []
+        window_start = start_time
+        while window_start < end_time:
+            windows.append((window_start, min(window_start + self._WINDOW, end_time)))
+            window_start += self._WINDOW
+
+        pages: List[List[Dict[str, Any]]] = [[] for _ in windows]
+        page_tokens: Dict[int, Optional[str]] = dict.fromkeys(range(len(windows)))
+        while page_tokens:
+            requests = {index: self._list_request(service, *windows[index], token) for index, token in page_tokens.items()}
+            if len(requests) == 1:
+                ((index, request),) = requests.items()
+                responses = {index: request.execute()}
+            else:
+                responses = self._execute_batch(service, requests)
+            page_tokens = {}
+            for index, response in responses.items():
+                pages[index].extend(response.get('items', []))
+                if response.get('nextPageToken'):
+                    page_tokens[index] = response['nextPageToken']
+
+        if len(pages) == 1:
+            return pages[0]
+        seen_ids = set()
+        merged = []
+        for page in pages:
+            for event in page:
+                event_id = event.get('id')
+                if event_id not in seen_ids:
+                    seen_ids.add(event_id)
+                    merged.append(event)
+        return merged
+
+    @staticmethod
+    def _keep(event: Dict[str, Any], include_all_day: bool) -> bool:
+        """Skips transparent events (marked as "Free") and, unless requested, all-day events."""
+        if event.get('transparency') == 'transparent':
+            return False
+        return include_all_day or 'date' not in event.get('start', {})
+
+    @staticmethod
+    def _event_to_dict(event: Dict[str, Any]) -> Dict[str, Any]:
+        """Flattens one Google Calendar event into the tool's result shape."""
+        start, end = event['start'], event['end']
+        attendees = [{
+            'email': attendee.get('email', ''),
+            'display_name': attendee.get('displayName', ''),
+            'response_status': attendee.get('responseStatus', 'needsAction'),
+            'is_organizer': attendee.get('organizer', False)
+        } for attendee in event.get('attendees', ())]
+        recurring_event_id = event.get('recurringEventId')
+
+        if 'date' in start:
+            event_data = {
+                'id': event.get('id', ''),
+                'title': event.get('summary', 'Untitled Event'),
+                'description': event.get('description', ''),
+                'location': event.get('location', ''),
+                'is_all_day': True,
+                'start_date': start.get('date'),
+                'end_date': end.get('date'),
+                'start_time': None,
+                'end_time': None,
+                'attendees': attendees,
+                'attendee_count': len(attendees),
+                'is_recurring': recurring_event_id is not None,
+            }
+        else:
+            # Timed event: Google already sends RFC 3339 strings, so pass them
+            # through and slice the local date off the front; only the
+            # duration needs the parsed datetimes
+            start_raw = start['dateTime']
+            end_raw = end['dateTime']
+            duration = _parse_rfc3339(end_raw) - _parse_rfc3339(start_raw)
+            event_data = {
+                'id': event.get('id', ''),
+                'title': event.get('summary', 'Untitled Event'),
+                'description': event.get('description', ''),
+                'location': event.get('location', ''),
+                'is_all_day': False,
+                'start_time': start_raw,
+                'end_time': end_raw,
+                'start_date': start_raw[:10],
+                'end_date': end_raw[:10],
+                'duration_minutes': int(duration.total_seconds() / 60),
+                'attendees': attendees,
+                'attendee_count': len(attendees),
+                'is_recurring': recurring_event_id is not None,
+            }
+        if recurring_event_id is not None:
+            event_data['recurring_event_id'] = recurring_event_id
+        return event_data
+
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = GetCalendarEventsWrapperArgs(**args)
+            validated_args = GetCalendarEventsWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             error_msg = f"Invalid arguments for retrieving events: {e.errors()}"
             return self._create_error_result(error_msg)
         
         # 2. Get user timezone
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
         except Exception as e:
-            self.logger.error(f"Invalid timezone in user preferences: {context.preferences.time_zone} - {e}")
+            self.logger.error("Invalid timezone in user preferences: %s - %s", context.preferences.time_zone, e)
             return self._create_error_result(f"Invalid timezone configuration: {context.preferences.time_zone}")
         
         # 3. Define time range
@@ -439,96 +753,18 @@ class GetCalendarEventsWrapper(ToolWrapper):
         
         try:
             # 4. Get busy slots from calendar (these represent the user's events)
-            self.logger.info(f"Fetching events from {start_time} to {end_time}")
+            self.logger.info("Fetching events from %s to %s", start_time, end_time)
             
             # Get calendar service to access full event details
             service = context.calendar_client._get_service()
             
-            events_list = []
-            page_token = None
-            
-            while True:
-                # Call Google Calendar API directly to get full event details
-                events_result = service.events().list(
-                    calendarId='primary',
-                    timeMin=start_time.isoformat(),
-                    timeMax=end_time.isoformat(),
-                    singleEvents=True,
-                    orderBy='startTime',
-                    pageToken=page_token,
-                    maxResults=250
-                ).execute()
-                
-                events = events_result.get('items', [])
-                
-                for event in events:
-                    # Skip transparent events (marked as "Free")
-                    if event.get('transparency') == 'transparent':
-                        continue
-                    
-                    # Check if it's an all-day event
-                    is_all_day = 'date' in event.get('start', {})
-                    
-                    # Skip all-day events if requested
-                    if is_all_day and not validated_args.include_all_day:
-                        continue
-                    
-                    # Extract event details
-                    event_data = {
-                        'id': event.get('id', ''),
-                        'title': event.get('summary', 'Untitled Event'),
-                        'description': event.get('description', ''),
-                        'location': event.get('location', ''),
-                        'is_all_day': is_all_day
-                    }
-                    
-                    # Extract start and end times
-                    if is_all_day:
-                        # All-day event
-                        event_data['start_date'] = event['start'].get('date')
-                        event_data['end_date'] = event['end'].get('date')
-                        event_data['start_time'] = None
-                        event_data['end_time'] = None
-                    else:
-                        # Timed event
-                        start_dt = datetime.fromisoformat(event['start'].get('dateTime'))
-                        end_dt = datetime.fromisoformat(event['end'].get('dateTime'))
-                        event_data['start_time'] = start_dt.isoformat()
-                        event_data['end_time'] = end_dt.isoformat()
-                        event_data['start_date'] = start_dt.date().isoformat()
-                        event_data['end_date'] = end_dt.date().isoformat()
-                        event_data['duration_minutes'] = int((end_dt - start_dt).total_seconds() / 60)
-                    
-                    # Extract attendees
-                    attendees = []
-                    if 'attendees' in event:
-                        for attendee in event['attendees']:
-                            attendees.append({
-                                'email': attendee.get('email', ''),
-                                'display_name': attendee.get('displayName', ''),
-                                'response_status': attendee.get('responseStatus', 'needsAction'),
-                                'is_organizer': attendee.get('organizer', False)
-                            })
-                    event_data['attendees'] = attendees
-                    event_data['attendee_count'] = len(attendees)
-                    
-                    # Add recurrence info if available
-                    if 'recurringEventId' in event:
-                        event_data['is_recurring'] = True
-                        event_data['recurring_event_id'] = event['recurringEventId']
-                    else:
-                        event_data['is_recurring'] = False
-                    
-                    events_list.append(event_data)
-                
-                page_token = events_result.get('nextPageToken')
-                if not page_token:
-                    break
-            
-            # Sort events by start time
-            events_list.sort(key=lambda e: e.get('start_time') or e.get('start_date'))
+            include_all_day = validated_args.include_all_day
+            events = self._fetch_events(service, start_time, end_time)
+            events_list = [self._event_to_dict(event) for event in events if self._keep(event, include_all_day)]
+
+            # No re-sort needed: orderBy='startTime' returns each window in chronological order
             
-            self.logger.info(f"Successfully retrieved {len(events_list)} events")
+            self.logger.info("Successfully retrieved %s events", len(events_list))
             
             # 5. Format the response
             result_data = {
@@ -545,7 +781,7 @@ class GetCalendarEventsWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error retrieving calendar events: {e}")
+            self.logger.exception("Error retrieving calendar events: %s", e)
             return self._create_error_result(f"Failed to retrieve calendar events: {str(e)}")
 
 
@@ -563,6 +799,8 @@ class GetAvailableSlotsWrapper(ToolWrapper):
     Wrapper for the 'get_available_slots' tool.
     Retrieves available time slots from the user's calendar considering their preferences.
     """
+    __slots__ = ()
+
     tool_name = "get_available_slots"
     logger = logging.getLogger(__name__)
     description = "Finds available (free) time slots in the user's calendar based on their preferences and existing events."
@@ -593,44 +831,61 @@ class GetAvailableSlotsWrapper(ToolWrapper):
         "required": []
     }
     
-    def _filter_slots_by_duration(self, slots: List[TimeSlot], min_duration: timedelta) -> List[TimeSlot]:
-        """Filter slots to only include those that meet minimum duration."""
-        return [slot for slot in slots if slot.duration >= min_duration]
-    
-    def _filter_slots_by_weekends(self, slots: List[TimeSlot], include_weekends: bool) -> List[TimeSlot]:
-        """Filter slots based on weekend preference."""
-        if include_weekends:
-            return slots
-        # Filter out Saturday (5) and Sunday (6)
-        return [slot for slot in slots if slot.start_time.weekday() < 5]
-    
-    def _group_slots_by_day(self, slots: List[TimeSlot]) -> Dict[str, List[TimeSlot]]:
-        """Group slots by date for easier presentation."""
-        grouped = {}
-        for slot in slots:
-            date_key = slot.start_time.date().isoformat()
-            if date_key not in grouped:
-                grouped[date_key] = []
-            grouped[date_key].append(slot)
-        return grouped
+    def _slots_result(self, validated_args: GetAvailableSlotsWrapperArgs, context: ExecutionContext,
+                      start_time: datetime, end_time: datetime, formatted_slots: List[Dict[str, Any]],
+                      summary_by_day: Dict[str, Dict[str, Any]], total_available_hours: float) -> ExecutorToolResult:
+        """Builds the get_available_slots response, with suggestions when nothing was found."""
+        total_slots = len(formatted_slots)
+        result_data = {
+            "message": f"Found {total_slots} available time slots in the next {validated_args.days} days.",
+            "summary": {
+                "total_slots": total_slots,
+                "total_available_hours": round(total_available_hours, 1),
+                "days_checked": validated_args.days,
+                "min_slot_duration_minutes": validated_args.min_duration_minutes,
+                "filters_applied": {
+                    "preferred_times_only": validated_args.preferred_times_only,
+                    "include_weekends": validated_args.include_weekends
+                }
+            },
+            "slots_by_day": summary_by_day,
+            "available_slots": formatted_slots,
+            "time_range": {
+                "start": start_time.isoformat(),
+                "end": end_time.isoformat(),
+                "timezone": context.preferences.time_zone
+            }
+        }
+        
+        # Add a note if no slots were found
+        if total_slots == 0:
+            result_data["message"] = f"No available time slots found in the next {validated_args.days} days with the specified criteria."
+            result_data["suggestions"] = [
+                "Try increasing the number of days to search",
+                "Reduce the minimum duration requirement",
+                "Include weekends if not already included",
+                "Disable 'preferred times only' filter if enabled"
+            ]
+        
+        return self._create_success_result(result_data)
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = GetAvailableSlotsWrapperArgs(**args)
+            validated_args = GetAvailableSlotsWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             error_msg = f"Invalid arguments for finding available slots: {e.errors()}"
             return self._create_error_result(error_msg)
         
         # 2. Get user timezone
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
         except Exception as e:
-            self.logger.error(f"Invalid timezone in user preferences: {context.preferences.time_zone} - {e}")
+            self.logger.error("Invalid timezone in user preferences: %s - %s", context.preferences.time_zone, e)
             return self._create_error_result(f"Invalid timezone configuration: {context.preferences.time_zone}")
         
         # 3. Define time range
@@ -641,7 +896,7 @@ class GetAvailableSlotsWrapper(ToolWrapper):
         
         try:
             # 4. Get available slots using calendar client
-            self.logger.info(f"Fetching available slots from {start_time} to {end_time}")
+            self.logger.info("Fetching available slots from %s to %s", start_time, end_time)
             
             # If preferred_times_only is True, temporarily modify preferences
             if validated_args.preferred_times_only:
@@ -659,49 +914,47 @@ class GetAvailableSlotsWrapper(ToolWrapper):
                 end_time=end_time
             )
             
-            self.logger.info(f"Found {len(available_slots)} raw available slots")
+            self.logger.info("Found %s raw available slots", len(available_slots))
+            if not available_slots:
+                return self._slots_result(validated_args, context, start_time, end_time, [], {}, 0.0)
             
-            # 5. Apply additional filters
+            # 5. Apply additional filters in one pass: minimum duration, weekdays only
+            # (Saturday is 5, Sunday 6) unless weekends are included, and, if
+            # preferred_times_only, lying inside the preferred meeting times
             min_duration = timedelta(minutes=validated_args.min_duration_minutes)
-            filtered_slots = self._filter_slots_by_duration(available_slots, min_duration)
-            filtered_slots = self._filter_slots_by_weekends(filtered_slots, validated_args.include_weekends)
-            
-            # If preferred_times_only, filter to only preferred meeting times
-            if validated_args.preferred_times_only and context.preferences.preferred_meeting_times:
-                preferred_filtered = []
-                for slot in filtered_slots:
-                    slot_start_time = slot.start_time.time()
-                    slot_end_time = slot.end_time.time()
-                    
-                    # Check if slot overlaps with any preferred meeting time
-                    for pref_start, pref_end in context.preferences.preferred_meeting_times:
-                        # Check if the slot is within preferred hours
-                        if (slot_start_time >= pref_start and slot_end_time <= pref_end):
-                            preferred_filtered.append(slot)
-                            break
-                filtered_slots = preferred_filtered
-            
-            self.logger.info(f"After filtering: {len(filtered_slots)} available slots")
-            
-            # 6. Group slots by day for better presentation
-            grouped_slots = self._group_slots_by_day(filtered_slots)
+            include_weekends = validated_args.include_weekends
+            preferred_mask = (_preferred_minutes_mask(tuple(context.preferences.preferred_meeting_times))
+                              if validated_args.preferred_times_only and context.preferences.preferred_meeting_times
+                              else None)
+            filtered_slots = [
+                slot for slot in available_slots
+                if slot.duration >= min_duration
+                and (include_weekends or slot.start_time.weekday() < 5)
+                and (preferred_mask is None or _within_preferred_minutes(preferred_mask, slot.start_time, slot.end_time))
+            ]
+            
+            self.logger.info("After filtering: %s available slots", len(filtered_slots))
+            
+            # 6. Sort once by start time; groupby then yields the days in order,
+            # each with its slots already in start order
+            filtered_slots.sort(key=attrgetter('start_time'))
             
             # 7. Format the response
             formatted_slots = []
             summary_by_day = {}
             
-            for date_str, day_slots in sorted(grouped_slots.items()):
-                day_date = datetime.fromisoformat(date_str).date()
+            total_available_seconds = 0.0
+            for day_date, day_slots in groupby(filtered_slots, key=lambda s: s.start_time.date()):
+                date_str = day_date.isoformat()
                 day_name = day_date.strftime("%A")
                 
-                summary_by_day[date_str] = {
-                    "date": date_str,
-                    "day_name": day_name,
-                    "slot_count": len(day_slots),
-                    "total_available_hours": sum(slot.duration.total_seconds() / 3600 for slot in day_slots)
-                }
-                
-                for slot in sorted(day_slots, key=lambda s: s.start_time):
+                # Each slot's length is read once and feeds its entry and the day total
+                slot_count = 0
+                day_seconds = 0.0
+                for slot in day_slots:
+                    seconds = slot.duration.total_seconds()
+                    slot_count += 1
+                    day_seconds += seconds
                     formatted_slots.append({
                         "date": date_str,
                         "day_name": day_name,
@@ -709,49 +962,23 @@ class GetAvailableSlotsWrapper(ToolWrapper):
                         "end_time": slot.end_time.isoformat(),
                         "start_time_local": slot.start_time.strftime("%I:%M %p"),
                         "end_time_local": slot.end_time.strftime("%I:%M %p"),
-                        "duration_minutes": int(slot.duration.total_seconds() / 60),
-                        "duration_hours": round(slot.duration.total_seconds() / 3600, 1)
+                        "duration_minutes": int(seconds / 60),
+                        "duration_hours": round(seconds / 3600, 1)
                     })
-            
-            # Calculate summary statistics
-            total_slots = len(filtered_slots)
-            total_available_hours = sum(slot.duration.total_seconds() / 3600 for slot in filtered_slots)
-            
-            result_data = {
-                "message": f"Found {total_slots} available time slots in the next {validated_args.days} days.",
-                "summary": {
-                    "total_slots": total_slots,
-                    "total_available_hours": round(total_available_hours, 1),
-                    "days_checked": validated_args.days,
-                    "min_slot_duration_minutes": validated_args.min_duration_minutes,
-                    "filters_applied": {
-                        "preferred_times_only": validated_args.preferred_times_only,
-                        "include_weekends": validated_args.include_weekends
-                    }
-                },
-                "slots_by_day": summary_by_day,
-                "available_slots": formatted_slots,
-                "time_range": {
-                    "start": start_time.isoformat(),
-                    "end": end_time.isoformat(),
-                    "timezone": context.preferences.time_zone
+                
+                summary_by_day[date_str] = {
+                    "date": date_str,
+                    "day_name": day_name,
+                    "slot_count": slot_count,
+                    "total_available_hours": day_seconds / 3600
                 }
-            }
-            
-            # Add a note if no slots were found
-            if total_slots == 0:
-                result_data["message"] = f"No available time slots found in the next {validated_args.days} days with the specified criteria."
-                result_data["suggestions"] = [
-                    "Try increasing the number of days to search",
-                    "Reduce the minimum duration requirement",
-                    "Include weekends if not already included",
-                    "Disable 'preferred times only' filter if enabled"
-                ]
+                total_available_seconds += day_seconds
             
-            return self._create_success_result(result_data)
+            return self._slots_result(validated_args, context, start_time, end_time,
+                                      formatted_slots, summary_by_day, total_available_seconds / 3600)
             
         except Exception as e:
-            self.logger.exception(f"Error retrieving available slots: {e}")
+            self.logger.exception("Error retrieving available slots: %s", e)
             return self._create_error_result(f"Failed to retrieve available slots: {str(e)}")
 
 
@@ -777,6 +1004,8 @@ class RescheduleEventWrapper(ToolWrapper):
     Wrapper for the 'reschedule_event' tool.
     Reschedules an existing calendar event to a new time.
     """
+    __slots__ = ()
+
     tool_name = "reschedule_event"
     logger = logging.getLogger(__name__)
     description = "Reschedules an existing calendar event to a new time, with optional conflict checking."
@@ -809,14 +1038,14 @@ class RescheduleEventWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = RescheduleEventWrapperArgs(**args)
+            validated_args = RescheduleEventWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_clarification_result(
                 f"Invalid arguments for rescheduling: {e.errors()}",
                 result_data={"validation_errors": e.errors()}
@@ -824,9 +1053,9 @@ class RescheduleEventWrapper(ToolWrapper):
         
         # 2. Parse datetime
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
         except Exception as e:
-            self.logger.error(f"Invalid timezone: {context.preferences.time_zone}")
+            self.logger.error("Invalid timezone: %s", context.preferences.time_zone)
             return self._create_error_result(f"Invalid timezone configuration: {context.preferences.time_zone}")
         
         new_start = parse_datetime_flexible(validated_args.new_start_time_str, user_tz)
@@ -884,14 +1113,15 @@ class RescheduleEventWrapper(ToolWrapper):
                     )
             
             # 5. Update the event
+            tz_name = str(user_tz)
             event_update = {
                 'start': {
                     'dateTime': new_start.isoformat(),
-                    'timeZone': str(user_tz)
+                    'timeZone': tz_name
                 },
                 'end': {
                     'dateTime': new_end.isoformat(),
-                    'timeZone': str(user_tz)
+                    'timeZone': tz_name
                 }
             }
             
@@ -900,8 +1130,9 @@ class RescheduleEventWrapper(ToolWrapper):
                 eventId=validated_args.event_id,
                 body=event_update
             ).execute()
+            _invalidate_available_slots(context.user_id)
             
-            self.logger.info(f"Successfully rescheduled event '{existing_event.get('summary', 'Untitled')}'")
+            self.logger.info("Successfully rescheduled event '%s'", existing_event.get('summary', 'Untitled'))
             
             return self._create_success_result({
                 "message": f"Successfully rescheduled '{existing_event.get('summary', 'Untitled Event')}'",
@@ -915,7 +1146,7 @@ class RescheduleEventWrapper(ToolWrapper):
             })
             
         except Exception as e:
-            self.logger.exception(f"Error rescheduling event: {e}")
+            self.logger.exception("Error rescheduling event: %s", e)
             return self._create_error_result(f"Failed to reschedule event: {str(e)}")
 
 
@@ -932,6 +1163,8 @@ class CancelEventWrapper(ToolWrapper):
     Wrapper for the 'cancel_event' tool.
     Cancels/deletes a calendar event.
     """
+    __slots__ = ()
+
     tool_name = "cancel_event"
     logger = logging.getLogger(__name__)
     description = "Cancels or deletes a calendar event, with optional notifications to attendees."
@@ -955,14 +1188,14 @@ class CancelEventWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = CancelEventWrapperArgs(**args)
+            validated_args = CancelEventWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_error_result(f"Invalid arguments for cancellation: {e.errors()}")
         
         try:
@@ -989,8 +1222,9 @@ class CancelEventWrapper(ToolWrapper):
                 eventId=validated_args.event_id,
                 sendNotifications=validated_args.send_notifications
             ).execute()
+            _invalidate_available_slots(context.user_id)
             
-            self.logger.info(f"Successfully cancelled event '{event_title}'")
+            self.logger.info("Successfully cancelled event '%s'", event_title)
             
             result_data = {
                 "message": f"Successfully cancelled '{event_title}'",
@@ -1007,7 +1241,7 @@ class CancelEventWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error cancelling event: {e}")
+            self.logger.exception("Error cancelling event: %s", e)
             return self._create_error_result(f"Failed to cancel event: {str(e)}")
 
 
@@ -1026,15 +1260,17 @@ class CreateTaskWrapperArgs(BaseModel):
     @classmethod
     def check_category(cls, v: str):
         """Validate category string matches enum values."""
-        if v.upper() not in ActivityCategory.__members__:
-            raise ValueError(f"Invalid category. Choose from: {list(ActivityCategory.__members__.keys())}")
-        return v
+        if v.upper() not in _CATEGORY_MAP:
+            raise ValueError(_INVALID_CATEGORY_MSG)
+        return v.upper()  # Normalized, so callers can index _CATEGORY_MAP directly
 
 class CreateTaskWrapper(ToolWrapper):
     """
     Wrapper for the 'create_task' tool.
     Creates a new task in the user's WantToDo list.
     """
+    __slots__ = ()
+
     tool_name = "create_task"
     logger = logging.getLogger(__name__)
     description = "Creates a new task or to-do item with specified details and priority."
@@ -1073,14 +1309,14 @@ class CreateTaskWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = CreateTaskWrapperArgs(**args)
+            validated_args = CreateTaskWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_clarification_result(
                 f"Invalid task details: {e.errors()}",
                 result_data={"validation_errors": e.errors()}
@@ -1090,12 +1326,12 @@ class CreateTaskWrapper(ToolWrapper):
         deadline = None
         if validated_args.deadline_str:
             try:
-                user_tz = pytz.timezone(context.preferences.time_zone)
+                user_tz = context.user_tz
                 deadline = parse_datetime_flexible(validated_args.deadline_str, user_tz)
                 if not deadline:
                     return self._create_error_result("Could not parse deadline")
             except Exception as e:
-                self.logger.error(f"Error parsing deadline: {e}")
+                self.logger.error("Error parsing deadline: %s", e)
                 return self._create_error_result(f"Invalid deadline format: {validated_args.deadline_str}")
         
         # 3. Create WantToDoActivity and save to DynamoDB
@@ -1105,7 +1341,7 @@ class CreateTaskWrapper(ToolWrapper):
                 description=validated_args.description,
                 estimated_duration=timedelta(minutes=validated_args.estimated_duration_minutes),
                 priority=validated_args.priority,
-                category=ActivityCategory(validated_args.category_str.upper()),
+                category=_CATEGORY_MAP[validated_args.category_str],
                 deadline=deadline,
                 status=ActivityStatus.TODO
             )
@@ -1133,10 +1369,10 @@ class CreateTaskWrapper(ToolWrapper):
             save_result = save_user_task(context.user_id, task_data)
             
             if save_result != "success":
-                self.logger.error(f"Failed to save task to DynamoDB: {save_result}")
+                self.logger.error("Failed to save task to DynamoDB: %s", save_result)
                 return self._create_error_result(f"Failed to save task: {save_result}")
             
-            self.logger.info(f"Successfully created and saved task '{task.title}' with ID {task.id}")
+            self.logger.info("Successfully created and saved task '%s' with ID %s", task.title, task.id)
             
             result_data = {
                 "message": f"Successfully created task '{task.title}'",
@@ -1155,7 +1391,7 @@ class CreateTaskWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error creating task: {e}")
+            self.logger.exception("Error creating task: %s", e)
             return self._create_error_result(f"Failed to create task: {str(e)}")
 
 
@@ -1173,16 +1409,16 @@ class GetTasksWrapperArgs(BaseModel):
     @classmethod
     def check_category(cls, v: Optional[str]):
         """Validate category if provided."""
-        if v and v.upper() not in ActivityCategory.__members__:
-            raise ValueError(f"Invalid category. Choose from: {list(ActivityCategory.__members__.keys())}")
-        return v
+        if v and v.upper() not in _CATEGORY_MAP:
+            raise ValueError(_INVALID_CATEGORY_MSG)
+        return v.upper() if v else v  # Normalized, so callers can index _CATEGORY_MAP directly
     
     @field_validator('status_str')
     @classmethod
     def check_status(cls, v: Optional[str]):
         """Validate status if provided."""
-        if v and v.upper() not in ActivityStatus.__members__:
-            raise ValueError(f"Invalid status. Choose from: {list(ActivityStatus.__members__.keys())}")
+        if v and v.upper() not in _STATUS_NAMES:
+            raise ValueError(_INVALID_STATUS_MSG)
         return v
 
 class GetTasksWrapper(ToolWrapper):
@@ -1190,6 +1426,8 @@ class GetTasksWrapper(ToolWrapper):
     Wrapper for the 'get_tasks' tool.
     Retrieves tasks from the user's WantToDo list with optional filters.
     """
+    __slots__ = ()
+
     tool_name = "get_tasks"
     logger = logging.getLogger(__name__)
     description = "Retrieves pending tasks or to-do items with optional filtering by category, priority, or deadline."
@@ -1225,21 +1463,21 @@ class GetTasksWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = GetTasksWrapperArgs(**args)
+            validated_args = GetTasksWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_error_result(f"Invalid filter parameters: {e.errors()}")
         
         # 2. Parse due_before date if provided
         due_before = None
         if validated_args.due_before_str:
             try:
-                user_tz = pytz.timezone(context.preferences.time_zone)
+                user_tz = context.user_tz
                 due_before = parse_datetime_flexible(validated_args.due_before_str, user_tz)
                 if not due_before:
                     return self._create_error_result("Could not parse due_before date")
@@ -1254,7 +1492,7 @@ class GetTasksWrapper(ToolWrapper):
             filters = {}
             
             if validated_args.category_str:
-                filters['category'] = validated_args.category_str.upper()
+                filters['category'] = validated_args.category_str
             
             if validated_args.priority_min:
                 filters['priority_min'] = validated_args.priority_min
@@ -1330,7 +1568,7 @@ class GetTasksWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error retrieving tasks: {e}")
+            self.logger.exception("Error retrieving tasks: %s", e)
             return self._create_error_result(f"Failed to retrieve tasks: {str(e)}")
 
 
@@ -1362,6 +1600,8 @@ class FindMeetingTimeWrapper(ToolWrapper):
     Wrapper for the 'find_meeting_time' tool.
     Finds optimal meeting times when all attendees are available.
     """
+    __slots__ = ()
+
     tool_name = "find_meeting_time"
     logger = logging.getLogger(__name__)
     description = "Finds available time slots when all specified attendees are free for a meeting."
@@ -1406,18 +1646,18 @@ class FindMeetingTimeWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = FindMeetingTimeWrapperArgs(**args)
+            validated_args = FindMeetingTimeWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_error_result(f"Invalid arguments: {e.errors()}")
         
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
             now = datetime.now(user_tz)
             start_search = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
             end_search = start_search + timedelta(days=validated_args.days_ahead)
@@ -1426,7 +1666,7 @@ class FindMeetingTimeWrapper(ToolWrapper):
             
             # For this implementation, we'll check the organizer's calendar
             # In a full implementation, you'd check all attendees' calendars
-            self.logger.info(f"Finding {validated_args.duration_minutes}-minute slot for {len(validated_args.attendee_emails)} attendees")
+            self.logger.info("Finding %s-minute slot for %s attendees", validated_args.duration_minutes, len(validated_args.attendee_emails))
             
             # Get available slots from organizer's calendar
             available_slots = context.calendar_client.get_available_time_slots(
@@ -1452,13 +1692,9 @@ class FindMeetingTimeWrapper(ToolWrapper):
                     
                     # If preferred times only, check against preferences
                     if validated_args.preferred_times_only and context.preferences.preferred_meeting_times:
-                        slot_start_time = slot.start_time.time()
-                        slot_end_time = slot_end.time()
-                        
-                        for pref_start, pref_end in context.preferences.preferred_meeting_times:
-                            if slot_start_time >= pref_start and slot_end_time <= pref_end:
-                                filtered_slots.append(slot)
-                                break
+                        preferred_mask = _preferred_minutes_mask(tuple(context.preferences.preferred_meeting_times))
+                        if _within_preferred_minutes(preferred_mask, slot.start_time, slot_end):
+                            filtered_slots.append(slot)
                     else:
                         filtered_slots.append(slot)
             
@@ -1508,7 +1744,7 @@ class FindMeetingTimeWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error finding meeting time: {e}")
+            self.logger.exception("Error finding meeting time: %s", e)
             return self._create_error_result(f"Failed to find meeting time: {str(e)}")
 
 
@@ -1537,6 +1773,8 @@ class GetCalendarAnalyticsWrapper(ToolWrapper):
     Wrapper for the 'get_calendar_analytics' tool.
     Analyzes calendar data to provide insights about time usage.
     """
+    __slots__ = ()
+
     tool_name = "get_calendar_analytics"
     logger = logging.getLogger(__name__)
     description = "Analyzes calendar events to provide insights about time allocation and meeting patterns."
@@ -1584,18 +1822,18 @@ class GetCalendarAnalyticsWrapper(ToolWrapper):
             return "OTHER"
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = GetCalendarAnalyticsWrapperArgs(**args)
+            validated_args = GetCalendarAnalyticsWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_error_result(f"Invalid arguments: {e.errors()}")
         
         try:
-            user_tz = pytz.timezone(context.preferences.time_zone)
+            user_tz = context.user_tz
             now = datetime.now(user_tz)
             end_time = now
             start_time = now - timedelta(days=validated_args.days_back)
@@ -1756,7 +1994,7 @@ class GetCalendarAnalyticsWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error analyzing calendar: {e}")
+            self.logger.exception("Error analyzing calendar: %s", e)
             return self._create_error_result(f"Failed to analyze calendar: {str(e)}")
 
 
@@ -1784,6 +2022,8 @@ class UpdateEventWrapper(ToolWrapper):
     Wrapper for the 'update_event' tool.
     Updates event details like title, description, location, or attendees.
     """
+    __slots__ = ()
+
     tool_name = "update_event"
     logger = logging.getLogger(__name__)
     description = "Updates an existing calendar event's details (title, description, location, attendees)."
@@ -1821,14 +2061,14 @@ class UpdateEventWrapper(ToolWrapper):
     }
     
     def run(self, args: Dict[str, Any], context: ExecutionContext) -> ExecutorToolResult:
-        self.logger.info(f"Running {self.tool_name} with args: {args}")
+        self.logger.info("Running %s with args: %s", self.tool_name, args)
         
         # 1. Validate arguments
         try:
-            validated_args = UpdateEventWrapperArgs(**args)
+            validated_args = UpdateEventWrapperArgs.model_validate(args)
             self.logger.debug("Arguments validated successfully.")
         except ValidationError as e:
-            self.logger.error(f"Argument validation failed: {e}")
+            self.logger.error("Argument validation failed: %s", e)
             return self._create_error_result(f"Invalid arguments: {e.errors()}")
         
         try:
@@ -1898,8 +2138,9 @@ class UpdateEventWrapper(ToolWrapper):
                 body=event,
                 sendNotifications=True  # Notify attendees of changes
             ).execute()
+            _invalidate_available_slots(context.user_id)
             
-            self.logger.info(f"Successfully updated event '{updated_event.get('summary', 'Untitled')}'")
+            self.logger.info("Successfully updated event '%s'", updated_event.get('summary', 'Untitled'))
             
             # 5. Prepare response
             changes_made = []
@@ -1936,13 +2177,14 @@ class UpdateEventWrapper(ToolWrapper):
             return self._create_success_result(result_data)
             
         except Exception as e:
-            self.logger.exception(f"Error updating event: {e}")
+            self.logger.exception("Error updating event: %s", e)
             return self._create_error_result(f"Failed to update event: {str(e)}")
 
 
 # --- Tool Registry (Conceptual) ---
 # The Tool Executor would use a registry like this to find the correct wrapper.
-TOOL_REGISTRY: Dict[str, ToolWrapper] = {
+# Read-only view: the registry is built once at import and shared across requests
+TOOL_REGISTRY: Mapping[str, ToolWrapper] = MappingProxyType({
     "schedule_activity": ScheduleActivityWrapper(),
     "get_calendar_events": GetCalendarEventsWrapper(),
     "get_available_slots": GetAvailableSlotsWrapper(),
@@ -1954,103 +2196,4 @@ TOOL_REGISTRY: Dict[str, ToolWrapper] = {
     "get_calendar_analytics": GetCalendarAnalyticsWrapper(),
     "update_event": UpdateEventWrapper(),
     # Add other tool wrappers here as they are created
-}
-
-# --- Example Usage ---
-if __name__ == '__main__':
-    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-    # Dummy context objects for example
-    class DummyPrefs(UserPreferences):
-        user_id: str = Field(..., description="User ID")
-        time_zone: str = Field(default="Europe/Paris", description="Time zone")
-        working_hours: Dict[DayOfWeek, tuple] = Field(
-            default={
-                DayOfWeek.MONDAY: (time(9, 0), time(17, 0)),
-                DayOfWeek.TUESDAY: (time(9, 0), time(17, 0)),
-                DayOfWeek.WEDNESDAY: (time(9, 0), time(17, 0)),
-                DayOfWeek.THURSDAY: (time(9, 0), time(17, 0)),
-                DayOfWeek.FRIDAY: (time(9, 0), time(16, 0)),
-            },
-            description="Working hours for each day"
-        )
-        days_off: List[date] = Field(default=[date(2025, 1, 1)], description="Days off")
-        preferred_break_duration: timedelta = Field(
-            default=timedelta(minutes=5), description="Preferred break duration"
-        )
-        work_block_max_duration: timedelta = Field(
-            default=timedelta(hours=2), description="Maximum work block duration"
-        )
-        energy_levels: Dict[tuple, EnergyLevel] = Field(
-            default={
-                (time(9, 0), time(12, 0)): EnergyLevel.HIGH,
-                (time(13, 0), time(17, 0)): EnergyLevel.MEDIUM,
-            },
-            description="Energy levels throughout the day"
-        )
-        rest_preferences: Dict[str, tuple] = Field(
-            default={"sleep_schedule": (time(23, 59), time(5, 0))},
-            description="Rest preferences"
-        )
-
-    class DummyClient(AbstractCalendarClient):
-        def authenticate(self): pass
-        def get_busy_slots(self, *args, **kwargs): return []
-        def calculate_free_slots(self, busy_slots, start_time, end_time):
-             # Basic demo: return the whole period if no busy slots
-             if not busy_slots: return [TimeSlot(start_time=start_time, end_time=end_time)]
-             return [] # Simplified
-        def get_available_time_slots(self, preferences, start_time, end_time, **kwargs):
-            # Simulate Task 5 filtering - for demo, return a few slots
-             tz = pytz.timezone(preferences.time_zone)
-             now = datetime.now(tz)
-             return [
-                 TimeSlot(start_time=now+timedelta(hours=1), end_time=now+timedelta(hours=3)),
-                 TimeSlot(start_time=now+timedelta(hours=5), end_time=now+timedelta(hours=8)),
-             ]
-
-
-    client_secret_path = "../credentials.json"  # Path to your client secret file
-    token_path = "../token.json"  # Path to your token file
-    scopes = ['https://www.googleapis.com/auth/calendar']  # Define your scopes
-    # Attempt to create, might need error handling if creds missing
-    client = GoogleCalendarAPIClient(client_secret_path, token_path, scopes)
-
-    exec_context = ExecutionContext(
-        user_id="user_123",
-        preferences=DummyPrefs(user_id="user_123"),
-        calendar_client=client
-    )
-
-    # # --- Test Cases ---
-    print("\n--- Test Case 1: Flexible Scheduling (Duration) ---")
-    args1 = {"title": "Write report", "duration_minutes": 90, "category_str": "WORK", "priority": 8, 'description': "Complete the quarterly report."}
-    wrapper1 = ScheduleActivityWrapper()
-    result1 = wrapper1.run(args1, exec_context)
-    print(result1.model_dump_json(indent=2))
-
-    # print("\n--- Test Case 2: Fixed Time ---")
-    # args2 = {"title": "Fixed Meeting", "start_time_str": "2025-05-02T14:00:00+02:00", "end_time_str": "2025-05-02T15:00:00+02:00"
-    #          , "description": "Discuss project updates", "category_str": "WORK"}
-    # wrapper2 = ScheduleActivityWrapper()
-    # result2 = wrapper2.run(args2, exec_context)
-    # print(result2.model_dump_json(indent=2))
-
-    # print("\n--- Test Case 3: Insufficient Info ---")
-    # args3 = {"title": "Vague Task"}
-    # wrapper3 = ScheduleActivityWrapper()
-    # result3 = wrapper3.run(args3, exec_context)
-    # print(result3.model_dump_json(indent=2))
-    #
-    # print("\n--- Test Case 4: Validation Error (Bad Category) ---")
-    # args4 = {"title": "My Hobby", "duration_minutes": 60, "category_str": "FUN"}
-    # wrapper4 = ScheduleActivityWrapper()
-    # result4 = wrapper4.run(args4, exec_context)
-    # print(result4.model_dump_json(indent=2))
-    #
-    # print("\n--- Test Case 5: Validation Error (No Title) ---")
-    # args5 = {"duration_minutes": 60, "category_str": "WORK"}
-    # wrapper5 = ScheduleActivityWrapper()
-    # result5 = wrapper5.run(args5, exec_context)
-    # print(result5.model_dump_json(indent=2))
-
+})
@@ -0,0 +1,122 @@
+# examples/schedule_wrapper_demo.py
+"""
+Runs ScheduleActivityWrapper against a real Google Calendar client.
+
+Usage (from the repository root):
+    python examples/schedule_wrapper_demo.py
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timedelta, time, date
+from pathlib import Path
+from zoneinfo import ZoneInfo
+from typing import Dict, List
+
+from pydantic import Field
+
+# The app modules import each other by bare name, so put app/ on the path
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "app"))
+
+from calendar_client import AbstractCalendarClient, GoogleCalendarAPIClient  # noqa: E402
+from models import DayOfWeek, EnergyLevel, TimeSlot, UserPreferences  # noqa: E402
+from tool_interface import ExecutionContext  # noqa: E402
+from tool_wrappers import ScheduleActivityWrapper  # noqa: E402
+
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+# Dummy context objects for example
+class DummyPrefs(UserPreferences):
+    user_id: str = Field(..., description="User ID")
+    time_zone: str = Field(default="Europe/Paris", description="Time zone")
+    working_hours: Dict[DayOfWeek, tuple] = Field(
+        default={
+            DayOfWeek.MONDAY: (time(9, 0), time(17, 0)),
+            DayOfWeek.TUESDAY: (time(9, 0), time(17, 0)),
+            DayOfWeek.WEDNESDAY: (time(9, 0), time(17, 0)),
+            DayOfWeek.THURSDAY: (time(9, 0), time(17, 0)),
+            DayOfWeek.FRIDAY: (time(9, 0), time(16, 0)),
+        },
+        description="Working hours for each day"
+    )
+    days_off: List[date] = Field(default=[date(2025, 1, 1)], description="Days off")
+    preferred_break_duration: timedelta = Field(
+        default=timedelta(minutes=5), description="Preferred break duration"
+    )
+    work_block_max_duration: timedelta = Field(
+        default=timedelta(hours=2), description="Maximum work block duration"
+    )
+    energy_levels: Dict[tuple, EnergyLevel] = Field(
+        default={
+            (time(9, 0), time(12, 0)): EnergyLevel.HIGH,
+            (time(13, 0), time(17, 0)): EnergyLevel.MEDIUM,
+        },
+        description="Energy levels throughout the day"
+    )
+    rest_preferences: Dict[str, tuple] = Field(
+        default={"sleep_schedule": (time(23, 59), time(5, 0))},
+        description="Rest preferences"
+    )
+
+class DummyClient(AbstractCalendarClient):
+    def authenticate(self): pass
+    def get_busy_slots(self, *args, **kwargs): return []
+    def calculate_free_slots(self, busy_slots, start_time, end_time):
+         # Basic demo: return the whole period if no busy slots
+         if not busy_slots: return [TimeSlot(start_time=start_time, end_time=end_time)]
+         return [] # Simplified
+    def get_available_time_slots(self, preferences, start_time, end_time, **kwargs):
+        # Simulate Task 5 filtering - for demo, return a few slots
+         tz = ZoneInfo(preferences.time_zone)
+         now = datetime.now(tz)
+         return [
+             TimeSlot(start_time=now+timedelta(hours=1), end_time=now+timedelta(hours=3)),
+             TimeSlot(start_time=now+timedelta(hours=5), end_time=now+timedelta(hours=8)),
+         ]
+
+
+client_secret_path = "../credentials.json"  # Path to your client secret file
+token_path = "../token.json"  # Path to your token file
+scopes = ['https://www.googleapis.com/auth/calendar']  # Define your scopes
+# Attempt to create, might need error handling if creds missing
+client = GoogleCalendarAPIClient(client_secret_path, token_path, scopes)
+
+exec_context = ExecutionContext(
+    user_id="user_123",
+    preferences=DummyPrefs(user_id="user_123"),
+    calendar_client=client
+)
+
+# # --- Test Cases ---
+print("\n--- Test Case 1: Flexible Scheduling (Duration) ---")
+args1 = {"title": "Write report", "duration_minutes": 90, "category_str": "WORK", "priority": 8, 'description': "Complete the quarterly report."}
+wrapper1 = ScheduleActivityWrapper()
+result1 = wrapper1.run(args1, exec_context)
+print(json.dumps(result1.to_dict(), indent=2, default=str))
+
+# print("\n--- Test Case 2: Fixed Time ---")
+# args2 = {"title": "Fixed Meeting", "start_time_str": "2025-05-02T14:00:00+02:00", "end_time_str": "2025-05-02T15:00:00+02:00"
+#          , "description": "Discuss project updates", "category_str": "WORK"}
+# wrapper2 = ScheduleActivityWrapper()
+# result2 = wrapper2.run(args2, exec_context)
+# print(json.dumps(result2.to_dict(), indent=2, default=str))
+
+# print("\n--- Test Case 3: Insufficient Info ---")
+# args3 = {"title": "Vague Task"}
+# wrapper3 = ScheduleActivityWrapper()
+# result3 = wrapper3.run(args3, exec_context)
+# print(json.dumps(result3.to_dict(), indent=2, default=str))
+#
+# print("\n--- Test Case 4: Validation Error (Bad Category) ---")
+# args4 = {"title": "My Hobby", "duration_minutes": 60, "category_str": "FUN"}
+# wrapper4 = ScheduleActivityWrapper()
+# result4 = wrapper4.run(args4, exec_context)
+# print(json.dumps(result4.to_dict(), indent=2, default=str))
+#
+# print("\n--- Test Case 5: Validation Error (No Title) ---")
+# args5 = {"duration_minutes": 60, "category_str": "WORK"}
+# wrapper5 = ScheduleActivityWrapper()
+# result5 = wrapper5.run(args5, exec_context)
+# print(json.dumps(result5.to_dict(), indent=2, default=str))
+
@@ -0,0 +1,96 @@
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build_from_document
+
+from datetime import datetime, timedelta, timezone
+
+from app.calendar_client import EventSpec, GoogleCalendarAPIClient, _calendar_discovery_doc
+
+
+def test_discovery_doc_is_parsed_once_and_reusable():
+    doc = _calendar_discovery_doc()
+    assert _calendar_discovery_doc() is doc
+
+    first = build_from_document(doc, credentials=Credentials(token="a"))
+    second = build_from_document(doc, credentials=Credentials(token="b"))
+
+    assert hasattr(first, "events") and hasattr(second, "freebusy")
+    assert _calendar_discovery_doc() == doc
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append(len(self.requests))
+        if len(self.service.batches) in self.service.failing_batches:
+            raise ConnectionError("batch request failed")
+        for request_id, body in self.requests:
+            if body["summary"] == "fails":
+                self.callback(request_id, None, RuntimeError("rejected"))
+            else:
+                self.callback(request_id, {"id": body["summary"]}, None)
+
+
+class _FakeService:
+    def __init__(self, failing_batches=()):
+        self.batches = []
+        self.inserted = []
+        self.failing_batches = set(failing_batches)
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+    def events(self):
+        return self
+
+    def insert(self, calendarId, body):
+        self.inserted.append(body)
+        return body
+
+
+def test_batch_add_events_chunks_requests_and_keeps_input_order():
+    client = GoogleCalendarAPIClient(token_info={})
+    client._service = _FakeService()
+    start = datetime(2025, 5, 12, 9, tzinfo=timezone.utc)
+    events = [EventSpec("fails" if i == 3 else f"e{i}", start + timedelta(hours=i), start + timedelta(hours=i, minutes=30))
+              for i in range(120)]
+
+    created = client.batch_add_events(events)
+
+    assert client._service.batches == [50, 50, 20]
+    assert created[3] is None
+    assert [event["id"] for i, event in enumerate(created) if i != 3] == [f"e{i}" for i in range(120) if i != 3]
+
+
+def test_batch_add_events_reports_earlier_batches_when_one_fails():
+    client = GoogleCalendarAPIClient(token_info={})
+    client._service = _FakeService(failing_batches={2})
+    start = datetime(2025, 5, 12, 9, tzinfo=timezone.utc)
+    events = [EventSpec(f"e{i}", start + timedelta(hours=i), start + timedelta(hours=i, minutes=30)) for i in range(120)]
+
+    created = client.batch_add_events(events)
+
+    assert client._service.batches == [50, 50, 20]
+    assert [event["id"] for event in created[:50]] == [f"e{i}" for i in range(50)]
+    assert created[50:100] == [None] * 50
+    assert [event["id"] for event in created[100:]] == [f"e{i}" for i in range(100, 120)]
+
+
+def test_batch_add_events_sends_attendees_and_location():
+    client = GoogleCalendarAPIClient(token_info={})
+    client._service = _FakeService()
+    start = datetime(2025, 5, 12, 9, tzinfo=timezone.utc)
+
+    client.batch_add_events([
+        EventSpec("sync", start, start + timedelta(hours=1), "d", ["a@example.com", "b@example.com"], "Room 1"),
+        EventSpec("focus", start, start + timedelta(hours=1)),
+    ])
+
+    with_guests, alone = client._service.inserted
+    assert with_guests["attendees"] == [{"email": "a@example.com"}, {"email": "b@example.com"}]
+    assert with_guests["location"] == "Room 1"
+    assert alone["attendees"] == [] and "location" not in alone
@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.gemini_interface import ConversationTurn, ToolResult
+
+
+def test_tool_result_to_json_matches_pydantic_output():
+    result = ToolResult.model_construct(name="schedule_activity", response={
+        "status": "success",
+        "utc": datetime(2025, 5, 10, 8, tzinfo=timezone.utc),
+        "local": datetime(2025, 5, 10, 10, tzinfo=ZoneInfo("Europe/Paris")),
+        "duration": timedelta(minutes=30),
+        "items": [1, 2.5, None, "café"],
+    })
+
+    assert result.to_json() == result.model_dump_json()
+    assert ConversationTurn.function_turn(result).parts == [f"FUNCTION RESULT: {result.model_dump_json()}"]
@@ -0,0 +1,42 @@
+import asyncio
+
+import orjson
+
+from app import orchestration_service
+from app.gemini_interface import FunctionCall
+from app.tool_wrappers import ToolWrapper
+
+
+class _EchoWrapper(ToolWrapper):
+    tool_name = "echo"
+
+    def run(self, args, context):
+        if args.get("fail"):
+            raise RuntimeError("boom")
+        return self._create_success_result(dict(args))
+
+
+def test_aexecute_tool_runs_wrapper_and_reports_failures(monkeypatch):
+    monkeypatch.setattr(orchestration_service, "TOOL_REGISTRY", {"echo": _EchoWrapper()})
+    executor = orchestration_service.AbstractToolExecutor()
+
+    def run(call):
+        return asyncio.run(executor.aexecute_tool(call, context=None))
+
+    ok = run(FunctionCall(name="echo", args={"n": 1}))
+    missing = run(FunctionCall(name="missing", args={}))
+    failed = run(FunctionCall(name="echo", args={"fail": True}))
+
+    assert [r.status.value for r in (ok, missing, failed)] == ["success", "error", "error"]
+    assert ok.result == {"n": 1}
+    assert "not found" in missing.error_details
+    assert "boom" in failed.error_details
+
+
+def test_tools_config_is_built_once_per_tool_list():
+    first = orchestration_service._tools_config(orjson.dumps(list(orchestration_service.TOOL_DEFINITIONS)))
+    again = orchestration_service._tools_config(orjson.dumps(list(orchestration_service.TOOL_DEFINITIONS)))
+
+    assert again is first
+    declarations = first.tools[0].function_declarations
+    assert [d.name for d in declarations] == list(orchestration_service.TOOL_DEFINITIONS_BY_NAME)
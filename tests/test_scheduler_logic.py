@@ -0,0 +1,65 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.models import ActivityCategory, DayOfWeek, TimeSlot, UserPreferences, WantToDoActivity
+from app.scheduler_logic import filter_slots_by_preferences, schedule_single, schedule_want_to_do_basic
+
+BASE = datetime(2025, 5, 12, 9, 0, tzinfo=timezone.utc)
+
+
+def _slot(start_h: float, end_h: float) -> TimeSlot:
+    return TimeSlot(start_time=BASE + timedelta(hours=start_h), end_time=BASE + timedelta(hours=end_h))
+
+
+def _activity(title: str, minutes: int) -> WantToDoActivity:
+    return WantToDoActivity(id=title, title=title, estimated_duration=timedelta(minutes=minutes),
+                            priority=5, category=ActivityCategory.WORK)
+
+
+def test_first_fit_consumes_slots_in_order():
+    slots = [_slot(3, 4), _slot(0, 1)]
+    activities = [_activity("a", 30), _activity("b", 30), _activity("c", 45), _activity("d", 90)]
+
+    scheduled, unscheduled = schedule_want_to_do_basic(activities, slots)
+
+    assert {k: (v.start_time, v.end_time) for k, v in scheduled.items()} == {
+        "a": (BASE, BASE + timedelta(minutes=30)),
+        "b": (BASE + timedelta(minutes=30), BASE + timedelta(hours=1)),
+        "c": (BASE + timedelta(hours=3), BASE + timedelta(hours=3, minutes=45)),
+    }
+    assert [activity.id for activity in unscheduled] == ["d"]
+    # The caller's slots are left untouched
+    assert slots == [_slot(3, 4), _slot(0, 1)]
+
+
+def test_schedule_single_matches_first_fit_without_touching_inputs():
+    slots = [_slot(3, 5), _slot(0, 0.25), _slot(1, 2)]
+    activity = _activity("a", 45)
+
+    assigned = schedule_single(activity, slots)
+    scheduled, _ = schedule_want_to_do_basic([_activity("a", 45)], list(slots))
+
+    assert (assigned.start_time, assigned.end_time) == (scheduled["a"].start_time, scheduled["a"].end_time)
+    assert len(slots) == 3 and activity.status.value == "TODO"
+    # Clipping to not_before can disqualify a slot that would otherwise fit
+    assert schedule_single(activity, slots, not_before=BASE + timedelta(hours=1.5)).start_time == BASE + timedelta(hours=3)
+    assert schedule_single(_activity("b", 180), slots) is None
+
+
+def test_filter_slots_by_preferences_clips_to_local_working_hours():
+    paris = ZoneInfo("Europe/Paris")
+    prefs = UserPreferences(
+        user_id="u1", time_zone="Europe/Paris", days_off=[date(2025, 3, 31)],
+        working_hours={day: (time(9, 0), time(17, 0)) for day in DayOfWeek},
+    )
+    # Spans the spring-forward night (30 March) and a day off (31 March)
+    raw = [TimeSlot(start_time=datetime(2025, 3, 29, 12, tzinfo=timezone.utc),
+                    end_time=datetime(2025, 4, 1, 10, tzinfo=timezone.utc))]
+
+    slots = filter_slots_by_preferences(raw, prefs)
+
+    assert [(s.start_time.astimezone(paris).replace(tzinfo=None), s.end_time.astimezone(paris).replace(tzinfo=None)) for s in slots] == [
+        (datetime(2025, 3, 29, 13), datetime(2025, 3, 29, 17)),
+        (datetime(2025, 3, 30, 9), datetime(2025, 3, 30, 17)),
+        (datetime(2025, 4, 1, 9), datetime(2025, 4, 1, 12)),
+    ]
@@ -0,0 +1,242 @@
+import asyncio
+import time
+
+import orjson
+import pytest
+from botocore.exceptions import ClientError
+
+from app.gemini_interface import ConversationTurn
+from app.session_manager import DynamoSessionManager
+
+
+class _FakeSessionsTable:
+    """Minimal in-memory stand-in for the chat sessions table."""
+
+    def __init__(self):
+        self.items = {}
+        self.conflicts_to_inject = 0
+        self.update_conditions = []
+        self.get_item_calls = 0
+        self.consistent_reads = []
+        self.lost_responses_to_inject = 0
+
+    def put_item(self, Item):
+        self.items[Item["session_id"]] = dict(Item)
+
+    def get_item(self, Key, ConsistentRead=False, **kwargs):
+        self.get_item_calls += 1
+        self.consistent_reads.append(ConsistentRead)
+        item = self.items.get(Key["session_id"])
+        return {"Item": dict(item)} if item else {}
+
+    def update_item(self, Key, ExpressionAttributeValues, ConditionExpression=None, **kwargs):
+        self.update_conditions.append(ConditionExpression)
+        item = self.items.setdefault(Key["session_id"], {"session_id": Key["session_id"]})
+        if self.conflicts_to_inject:
+            # Simulate another writer bumping the version first
+            self.conflicts_to_inject -= 1
+            item["version"] = item.get("version", 0) + 1
+        if (ConditionExpression and "version" in item
+                and item["version"] != ExpressionAttributeValues[":expected_version"]):
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException", "Message": "conflict"}}, "UpdateItem")
+        item["history"] = item.get("history", []) + ExpressionAttributeValues[":turn"]
+        item["version"] = item.get("version", 0) + 1
+        if self.lost_responses_to_inject:
+            # The write landed but its response was lost; the SDK's retry then
+            # fails the version condition against our own write
+            self.lost_responses_to_inject -= 1
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException", "Message": "conflict"}}, "UpdateItem")
+        return {"Attributes": {"version": item["version"]}}
+
+
+def _manager():
+    manager = DynamoSessionManager()
+    manager.table = _FakeSessionsTable()
+    return manager
+
+
+def test_append_turn_retries_after_version_conflict():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    manager.table.conflicts_to_inject = 1
+
+    asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("hello")))
+
+    item = manager.table.items["s1"]
+    assert item["history"][-1]["parts"] == ["USER: hello"]
+    assert item["version"] == 2
+    assert manager.table.consistent_reads == [True]
+
+
+def test_append_turn_rereads_consistently_and_skips_an_already_stored_turn():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    manager.table.lost_responses_to_inject = 1
+
+    asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("hello")))
+
+    item = manager.table.items["s1"]
+    assert [turn["parts"] for turn in item["history"]] == [["USER: hello"]]
+    assert manager.table.consistent_reads == [True]
+
+
+def test_append_turn_gives_up_after_max_attempts():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    manager.table.conflicts_to_inject = DynamoSessionManager.MAX_APPEND_ATTEMPTS
+
+    with pytest.raises(ClientError):
+        asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("hello")))
+
+
+def test_append_turn_without_a_known_version_appends_unconditionally():
+    manager = _manager()
+    manager.table.put_item(Item={"session_id": "s1", "history": [], "version": 4})
+
+    asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("hello")))
+
+    assert manager.table.get_item_calls == 0
+    assert manager.table.update_conditions == [None]
+    assert manager.table.items["s1"]["version"] == 5
+
+    # The version returned by that write conditions the next one
+    asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("again")))
+    assert manager.table.update_conditions[-1] is not None
+
+
+def test_get_history_tail_keeps_system_prompt():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    for i in range(5):
+        asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn(f"msg {i}")))
+
+    history = asyncio.run(manager.get_history("s1", tail=2))
+
+    assert history[0].role == "SYSTEM"
+    assert [turn.parts[0] for turn in history[1:]] == ["USER: msg 3", "USER: msg 4"]
+
+
+def test_full_history_decodes_stored_system_prompt():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    asyncio.run(manager.append_turn("s1", ConversationTurn.user_turn("hi")))
+
+    assert isinstance(manager.table.items["s1"]["system_prompt"], str)
+    history = asyncio.run(manager.get_history("s1"))
+
+    assert [turn.role for turn in history] == ["SYSTEM", "USER"]
+
+
+def test_get_history_splits_legacy_system_turns():
+    manager = _manager()
+    legacy_turns = [
+        {"role": "SYSTEM", "parts": ["system"]},
+        {"role": "USER", "parts": ["USER: a"]},
+        {"role": "USER", "parts": ["USER: b"]},
+    ]
+    manager.table.put_item(Item={"session_id": "old", "history": legacy_turns})
+
+    history = asyncio.run(manager.get_history("old", tail=1))
+
+    assert [turn.parts[0] for turn in history] == ["system", "USER: b"]
+
+
+class _FakeDynamoResource:
+    def __init__(self, table, unprocessed_rounds=1):
+        self.table = table
+        self.unprocessed_rounds = unprocessed_rounds
+        self.calls = 0
+
+    def batch_get_item(self, RequestItems):
+        self.calls += 1
+        ((table_name, request),) = RequestItems.items()
+        keys = request["Keys"]
+        if self.unprocessed_rounds:
+            # Throttle the second half of the keys once
+            self.unprocessed_rounds -= 1
+            keys, unprocessed = keys[: len(keys) // 2], keys[len(keys) // 2:]
+        else:
+            unprocessed = []
+        found = [self.table.items[k["session_id"]] for k in keys if k["session_id"] in self.table.items]
+        response = {"Responses": {table_name: found}}
+        if unprocessed:
+            response["UnprocessedKeys"] = {table_name: {"Keys": unprocessed}}
+        return response
+
+
+def test_get_histories_batches_and_retries_unprocessed_keys():
+    manager = _manager()
+    manager.table.name = "sessions"
+    manager._dynamodb = _FakeDynamoResource(manager.table)
+    for sid in ("a", "b", "c", "d"):
+        asyncio.run(manager.create_session("u1", sid))
+
+    histories = asyncio.run(manager.get_histories(["a", "b", "c", "d", "missing"]))
+
+    assert sorted(histories) == ["a", "b", "c", "d"]
+    assert histories["a"][0].role == "SYSTEM"
+    assert manager._dynamodb.calls == 2
+
+
+def test_build_system_instruction_is_cached_per_time_zone():
+    from zoneinfo import ZoneInfo
+
+    from app import session_manager
+
+    paris = session_manager.build_system_instruction(ZoneInfo("Europe/Paris"))
+    tokyo = session_manager.build_system_instruction(ZoneInfo("Asia/Tokyo"))
+
+    assert "Current zone info is : Europe/Paris" in paris
+    assert "Current zone info is : Asia/Tokyo" in tokyo
+    # Key and value are replaced together
+    key, value = session_manager._last_system_instruction
+    assert key[0] == "Asia/Tokyo" and value is tokyo
+
+
+def test_get_history_reads_off_the_event_loop():
+    manager = _manager()
+    asyncio.run(manager.create_session("u1", "s1"))
+    table_get_item = manager.table.get_item
+
+    def slow_get_item(**kwargs):
+        time.sleep(0.1)
+        return table_get_item(**kwargs)
+
+    manager.table.get_item = slow_get_item
+
+    async def load_two():
+        started = time.perf_counter()
+        await asyncio.gather(manager.get_history("s1"), manager.get_history("s1"))
+        return time.perf_counter() - started
+
+    assert asyncio.run(load_two()) < 0.18
+
+
+def test_tail_and_full_history_share_the_stored_system_prompt():
+    manager = _manager()
+    stored = orjson.dumps([{"role": "SYSTEM", "parts": ["stored prompt"]}]).decode()
+    manager.table.put_item(Item={"session_id": "s1", "system_prompt": stored,
+                                 "history": [{"role": "USER", "parts": ["USER: hi"]}], "version": 1})
+
+    full = asyncio.run(manager.get_history("s1"))
+    tail = asyncio.run(manager.get_history("s1", tail=1))
+
+    assert full[0].parts == tail[0].parts == ["stored prompt"]
+
+
+def test_get_history_tail_starts_on_a_user_turn():
+    manager = _manager()
+    turns = [
+        {"role": "USER", "parts": ["USER: a"]},
+        {"role": "USER", "parts": ["USER: schedule lunch"]},
+        {"role": "AI", "parts": ["AI FUNCTION CALL: ..."]},
+        {"role": "FUNCTION", "parts": ["FUNCTION RESULT: ..."]},
+        {"role": "AI", "parts": ["done"]},
+    ]
+    manager.table.put_item(Item={"session_id": "s1", "history": turns})
+
+    history = asyncio.run(manager.get_history("s1", tail=2))
+
+    assert [turn.parts[0] for turn in history[1:]] == ["USER: schedule lunch", "AI FUNCTION CALL: ...",
+                                                      "FUNCTION RESULT: ...", "done"]
+    assert asyncio.run(manager.get_history("s1", tail=0))[1:] == []
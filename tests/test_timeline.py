@@ -0,0 +1,127 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.timeline import ScheduledItem, ScheduleTimeline, to_epoch_ns
+
+BASE = datetime(2025, 5, 10, 8, 0, tzinfo=timezone.utc)
+
+
+def test_to_epoch_ns_is_exact_across_time_zones():
+    paris = timezone(timedelta(hours=2))
+    moment = datetime(2025, 5, 10, 10, 0, 0, 123457, tzinfo=paris)
+
+    assert to_epoch_ns(moment) == to_epoch_ns(moment.astimezone(timezone.utc))
+    assert to_epoch_ns(moment) % 1000 == 0
+    assert to_epoch_ns(moment + timedelta(microseconds=1)) - to_epoch_ns(moment) == 1000
+
+
+def _item(start_h: float, end_h: float, title: str = "x") -> ScheduledItem:
+    return ScheduledItem(BASE + timedelta(hours=start_h), BASE + timedelta(hours=end_h), title)
+
+
+def _titles(items):
+    return [item.activity_obj for item in items]
+
+
+def test_items_are_kept_sorted():
+    timeline = ScheduleTimeline()
+    for item in (_item(3, 4, "c"), _item(1, 2, "a"), _item(1, 1.5, "a0"), _item(2, 3, "b")):
+        timeline.add_item(item)
+
+    assert _titles(timeline.get_all_items()) == ["a0", "a", "b", "c"]
+    assert _titles(timeline) == ["a0", "a", "b", "c"]
+    assert timeline[-1].activity_obj == "c"
+    assert len(timeline) == 4
+
+
+def test_find_overlapping_items_half_open():
+    timeline = ScheduleTimeline()
+    for item in (_item(1, 2, "a"), _item(2, 3, "b"), _item(3, 5, "c"), _item(4, 4.5, "d")):
+        timeline.add_item(item)
+
+    assert _titles(timeline.find_overlapping_items(BASE + timedelta(hours=3.5), BASE + timedelta(hours=4.25))) == ["c", "d"]
+    # Adjacent items do not overlap
+    assert _titles(timeline.find_overlapping_items(BASE + timedelta(hours=2), BASE + timedelta(hours=3))) == ["b"]
+    assert timeline.find_overlapping_items(BASE, BASE + timedelta(hours=1)) == []
+    assert not timeline.intersects_any(BASE, BASE + timedelta(hours=1))
+    assert timeline.intersects_any(BASE, BASE + timedelta(hours=1, minutes=1))
+
+
+def test_find_overlapping_items_validates_query():
+    timeline = ScheduleTimeline()
+    with pytest.raises(ValueError):
+        timeline.find_overlapping_items(BASE.replace(tzinfo=None), BASE.replace(tzinfo=None) + timedelta(hours=1))
+    with pytest.raises(ValueError):
+        timeline.find_overlapping_items(BASE, BASE)
+
+
+def test_unsafe_new_matches_validated_constructor():
+    start, end = BASE, BASE + timedelta(hours=1)
+    fast = ScheduledItem.unsafe_new(start, end, "a")
+
+    assert fast == ScheduledItem(start, end, "a")
+    assert (fast._start_ns, fast._end_ns) == (to_epoch_ns(start), to_epoch_ns(end))
+
+
+def _brute_force_overlaps(items, query_start, query_end):
+    return sorted(
+        (item for item in items if item.start_time < query_end and item.end_time > query_start),
+        key=lambda item: (item.start_time, item.end_time),
+    )
+
+
+@pytest.mark.parametrize("in_time_order", [True, False])
+def test_large_timeline_matches_brute_force(in_time_order):
+    rng = random.Random(42)
+    items = []
+    for i in range(600):
+        start_min = rng.randrange(0, 60 * 24 * 14, 5)
+        items.append(ScheduledItem(BASE + timedelta(minutes=start_min),
+                                   BASE + timedelta(minutes=start_min + rng.choice((15, 30, 60, 240, 2000))),
+                                   f"item {i}"))
+    if in_time_order:
+        items.sort(key=lambda item: item.start_time)
+    timeline = ScheduleTimeline()
+    for item in items:
+        timeline.add_item(item)
+
+    for _ in range(200):
+        query_start = BASE + timedelta(minutes=rng.randrange(-120, 60 * 24 * 15))
+        query_end = query_start + timedelta(minutes=rng.choice((1, 30, 90, 600)))
+        found = timeline.find_overlapping_items(query_start, query_end)
+        expected = _brute_force_overlaps(items, query_start, query_end)
+        # Items with identical times may come back in any relative order
+        assert [(i.start_time, i.end_time) for i in found] == [(i.start_time, i.end_time) for i in expected]
+        assert {id(i) for i in found} == {id(i) for i in expected}
+        assert timeline.intersects_any(query_start, query_end) == bool(expected)
+
+
+def test_repeated_query_sees_items_added_in_between():
+    timeline = ScheduleTimeline()
+    timeline.add_item(_item(1, 2, "a"))
+    query = (BASE + timedelta(hours=1), BASE + timedelta(hours=3))
+
+    first = timeline.find_overlapping_items(*query)
+    first.clear()  # callers may mutate the returned list
+    assert _titles(timeline.find_overlapping_items(*query)) == ["a"]
+
+    timeline.add_item(_item(2, 3, "b"))
+    assert _titles(timeline.find_overlapping_items(*query)) == ["a", "b"]
+
+
+def test_from_items_and_extend_match_incremental_adds():
+    items = [_item(h % 24, h % 24 + 1.5, f"i{h}") for h in range(0, 200, 3)]
+    incremental = ScheduleTimeline()
+    for item in items:
+        incremental.add_item(item)
+
+    bulk = ScheduleTimeline.from_items(items[:50])
+    bulk.extend(items[50:])
+
+    assert bulk.get_all_items() == incremental.get_all_items()
+    query = (BASE + timedelta(hours=5), BASE + timedelta(hours=9))
+    assert bulk.find_overlapping_items(*query) == incremental.find_overlapping_items(*query)
+    with pytest.raises(TypeError):
+        bulk.extend(["not an item"])
@@ -0,0 +1,434 @@
+import threading
+from datetime import datetime, time, timedelta, timezone
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import pytest
+from pydantic import ValidationError
+
+from app import tool_wrappers
+from app.tool_wrappers import TOOL_REGISTRY, GetAvailableSlotsWrapper, GetCalendarEventsWrapper, ScheduleActivityWrapper, ScheduleActivityWrapperArgs, parse_datetime_flexible
+# The app modules import each other by bare name, so the context types must come from those modules too
+from calendar_client import AbstractCalendarClient
+from models import DayOfWeek, TimeSlot, UserPreferences
+from tool_interface import ExecutionContext
+
+PARIS = ZoneInfo("Europe/Paris")
+
+
+@pytest.fixture(autouse=True)
+def _clear_availability_cache():
+    tool_wrappers._AVAIL_CACHE.clear()
+    yield
+    tool_wrappers._AVAIL_CACHE.clear()
+
+
+def test_parse_iso_with_offset_converts_to_user_tz():
+    parsed = parse_datetime_flexible("2025-05-10T12:00:00Z", PARIS)
+
+    assert parsed == datetime(2025, 5, 10, 12, 0, tzinfo=timezone.utc)
+    assert parsed.utcoffset() == datetime(2025, 5, 10, 14, 0, tzinfo=PARIS).utcoffset()
+
+
+def test_parse_naive_iso_is_localized():
+    assert parse_datetime_flexible("2025-05-10 14:00", PARIS) == datetime(2025, 5, 10, 14, 0, tzinfo=PARIS)
+
+
+def test_parse_falls_back_to_dateutil():
+    assert parse_datetime_flexible("May 10 2025 3pm", PARIS) == datetime(2025, 5, 10, 15, 0, tzinfo=PARIS)
+    assert parse_datetime_flexible("not a date", PARIS) is None
+    assert parse_datetime_flexible("", PARIS) is None
+
+
+def test_schedule_activity_args_ignore_extra_keys_and_are_frozen():
+    args = ScheduleActivityWrapperArgs.model_validate(
+        {"title": "Gym", "description": "Leg day", "category_str": "exercise", "unexpected": 1}
+    )
+
+    assert not hasattr(args, "unexpected")
+    with pytest.raises(ValidationError):
+        args.title = "Other"
+
+
+def test_schedule_activity_args_reject_unknown_category():
+    with pytest.raises(ValidationError, match="Invalid category"):
+        ScheduleActivityWrapperArgs.model_validate({"title": "x", "description": "y", "category_str": "nope"})
+
+
+def test_category_str_is_normalized_to_upper_case():
+    for raw in ("WORK", "work", "Work"):
+        args = ScheduleActivityWrapperArgs.model_validate({"title": "t", "description": "d", "category_str": raw})
+        assert args.category_str == "WORK"
+
+
+def test_parse_datetime_flexible_memoizes_results():
+    first = parse_datetime_flexible("2025-05-10T09:00:00+02:00", PARIS)
+
+    assert parse_datetime_flexible("2025-05-10T09:00:00+02:00", PARIS) is first
+
+
+def test_tool_registry_is_read_only_and_wrappers_are_slotted():
+    with pytest.raises(TypeError):
+        TOOL_REGISTRY["schedule_activity"] = None
+    for wrapper in TOOL_REGISTRY.values():
+        with pytest.raises(AttributeError):
+            wrapper.cache = {}
+
+
+def test_schedule_activity_args_strip_whitespace_before_validating():
+    args = ScheduleActivityWrapperArgs.model_validate({"title": " Gym ", "description": "x", "category_str": " exercise "})
+
+    assert (args.title, args.category_str) == ("Gym", "EXERCISE")
+
+
+class _RecordingCalendarClient(AbstractCalendarClient):
+    def __init__(self, free_slots=(), busy_slots=()):
+        self.added = []
+        self.free_slots = list(free_slots)
+        self.busy_slots = list(busy_slots)
+        self.availability_queries = 0
+
+    def authenticate(self): pass
+    def get_busy_slots(self, calendar_id, start_time, end_time):
+        return [slot for slot in self.busy_slots if slot.start_time < end_time and slot.end_time > start_time]
+    def calculate_free_slots(self, busy_slots, start_time, end_time): return []
+    def get_available_time_slots(self, calendar_id, preferences, start_time, end_time):
+        self.availability_queries += 1
+        return self.free_slots
+
+    def add_event(self, title, start_time, end_time, description=None, attendees=None, location=None):
+        self.added.append((title, start_time, end_time))
+        return {"id": "evt1", "htmlLink": "https://calendar.example/evt1"}
+
+
+def _context(client):
+    prefs = UserPreferences(user_id="u1", time_zone="Europe/Paris",
+                            working_hours={DayOfWeek.MONDAY: (time(9, 0), time(17, 0))})
+    return ExecutionContext(user_id="u1", preferences=prefs, calendar_client=client)
+
+
+@pytest.mark.parametrize("args, expected_end_hour", [
+    ({"start_time_str": "2025-05-12T10:00:00+02:00", "end_time_str": "2025-05-12T11:30:00+02:00"}, 11.5),
+    ({"start_time_str": "2025-05-12T10:00:00+02:00", "duration_minutes": 30}, 10.5),
+    ({"start_time_str": "2025-05-12T10:00:00+02:00", "end_time_str": "2025-05-12T12:00:00+02:00", "duration_minutes": 30}, 12),
+])
+def test_schedule_activity_fixed_time_scenarios(args, expected_end_hour):
+    client = _RecordingCalendarClient()
+
+    result = ScheduleActivityWrapper().run({"title": "Focus", "description": "d", **args}, _context(client))
+
+    assert result.status.value == "success"
+    ((_, start, end),) = client.added
+    assert (end - start).total_seconds() == (expected_end_hour - 10) * 3600
+
+
+@pytest.mark.parametrize("args", [{}, {"end_time_str": "2025-05-12T11:00:00+02:00"}, {"start_time_str": "2025-05-12T10:00:00+02:00"}])
+def test_schedule_activity_asks_for_more_details(args):
+    result = ScheduleActivityWrapper().run({"title": "Focus", "description": "d", **args}, _context(_RecordingCalendarClient()))
+
+    assert result.status.value == "clarification_needed"
+
+
+def test_schedule_activity_flexible_without_slots_is_an_error():
+    result = ScheduleActivityWrapper().run(
+        {"title": "Focus", "description": "d", "duration_minutes": 30, "category_str": "WORK"},
+        _context(_RecordingCalendarClient()),
+    )
+
+    assert result.status.value == "error"
+    assert "Could not find a suitable time slot" in result.error_details
+
+
+def _tomorrow_at(hour, minute=0):
+    return datetime.combine(datetime.now(PARIS).date() + timedelta(days=1), time(hour, minute), tzinfo=PARIS)
+
+
+def test_schedule_activity_flexible_uses_earliest_slot_that_fits():
+    short = TimeSlot(start_time=_tomorrow_at(9), end_time=_tomorrow_at(9, 20))
+    late = TimeSlot(start_time=_tomorrow_at(9) + timedelta(days=1), end_time=_tomorrow_at(12) + timedelta(days=1))
+    early = TimeSlot(start_time=_tomorrow_at(14), end_time=_tomorrow_at(15))
+    client = _RecordingCalendarClient(free_slots=[late, short, early])
+
+    result = ScheduleActivityWrapper().run(
+        {"title": "Focus", "description": "d", "duration_minutes": 30, "category_str": "work"}, _context(client)
+    )
+
+    assert result.status.value == "success"
+    assert client.added == [("Focus", early.start_time, early.start_time + timedelta(minutes=30))]
+    assert result.result["category"] == "WORK"
+
+
+def test_flexible_scheduling_reuses_cached_slots_until_a_write():
+    client = _RecordingCalendarClient(free_slots=[TimeSlot(start_time=_tomorrow_at(9), end_time=_tomorrow_at(12))])
+    args = {"title": "Focus", "description": "d", "duration_minutes": 30, "category_str": "WORK"}
+
+    ScheduleActivityWrapper().run({**args, "duration_minutes": 500}, _context(client))
+    ScheduleActivityWrapper().run({**args, "duration_minutes": 400}, _context(client))
+    assert client.availability_queries == 1
+
+    assert ScheduleActivityWrapper().run(args, _context(client)).status.value == "success"
+    ScheduleActivityWrapper().run(args, _context(client))
+    assert client.availability_queries == 2
+
+
+def test_flexible_scheduling_rechecks_a_cached_slot_before_booking():
+    morning = TimeSlot(start_time=_tomorrow_at(9), end_time=_tomorrow_at(12))
+    afternoon = TimeSlot(start_time=_tomorrow_at(14), end_time=_tomorrow_at(16))
+    client = _RecordingCalendarClient(free_slots=[morning, afternoon])
+    args = {"title": "Focus", "description": "d", "duration_minutes": 60, "category_str": "WORK"}
+    tool_wrappers._cached_available_slots(_context(client), datetime.now(PARIS), datetime.now(PARIS) + timedelta(days=7))
+
+    # Booked elsewhere (another worker, the Calendar UI) after the slots were cached
+    client.busy_slots = [TimeSlot(start_time=_tomorrow_at(9), end_time=_tomorrow_at(12))]
+    client.free_slots = [afternoon]
+    result = ScheduleActivityWrapper().run(args, _context(client))
+
+    assert result.status.value == "success"
+    assert client.added == [("Focus", _tomorrow_at(14), _tomorrow_at(15))]
+    assert client.availability_queries == 2
+
+
+def test_availability_cache_keys_on_preferences():
+    client = _RecordingCalendarClient()
+    start = _tomorrow_at(9)
+    context = _context(client)
+    changed = ExecutionContext(user_id="u1", calendar_client=client,
+                               preferences=context.preferences.model_copy(update={"days_off": [start.date()]}))
+
+    for ctx in (context, context, changed):
+        tool_wrappers._cached_available_slots(ctx, start, start + timedelta(days=7))
+
+    assert client.availability_queries == 2
+
+
+def test_flexible_scheduling_clips_slots_that_already_started():
+    now = datetime.now(PARIS)
+    client = _RecordingCalendarClient(free_slots=[TimeSlot(start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=2))])
+
+    ScheduleActivityWrapper().run(
+        {"title": "Focus", "description": "d", "duration_minutes": 30, "category_str": "WORK"}, _context(client)
+    )
+
+    ((_, start, end),) = client.added
+    assert start >= now and end - start == timedelta(minutes=30)
+
+
+def test_fixed_time_conflicts_ignore_adjacent_busy_slots():
+    def slot(start_h, end_h):
+        return TimeSlot(start_time=datetime(2025, 5, 12, start_h, tzinfo=PARIS), end_time=datetime(2025, 5, 12, end_h, tzinfo=PARIS))
+    args = {"title": "Focus", "description": "d", "start_time_str": "2025-05-12T10:00:00+02:00", "duration_minutes": 60}
+
+    adjacent = _RecordingCalendarClient(busy_slots=[slot(9, 10), slot(11, 12)])
+    assert ScheduleActivityWrapper().run(args, _context(adjacent)).status.value == "success"
+
+    overlapping = _RecordingCalendarClient(busy_slots=[slot(9, 10), slot(10, 11), slot(11, 12)])
+    result = ScheduleActivityWrapper().run(args, _context(overlapping))
+    assert result.status.value == "error"
+    assert overlapping.added == [] and len(result.result["conflicts"]) == 1
+
+
+def test_execution_context_resolves_user_tz_once():
+    context = _context(_RecordingCalendarClient())
+
+    assert context.user_tz is context.user_tz
+    assert context.user_tz == PARIS
+
+
+class _EventsListService:
+    def __init__(self, items):
+        self.items = items
+
+    def events(self):
+        return self
+
+    def list(self, **kwargs):
+        return self
+
+    def execute(self):
+        return {"items": self.items}
+
+
+def test_get_calendar_events_passes_google_timestamps_through():
+    client = _RecordingCalendarClient()
+    client._get_service = lambda: _EventsListService([
+        {"id": "a", "summary": "Standup", "start": {"dateTime": "2025-05-12T23:30:00Z"}, "end": {"dateTime": "2025-05-13T01:00:00+01:00"}},
+        {"id": "b", "summary": "Holiday", "start": {"date": "2025-05-14"}, "end": {"date": "2025-05-15"}},
+    ])
+
+    result = GetCalendarEventsWrapper().run({"days": 7}, _context(client))
+
+    timed, all_day = result.result["events"]
+    assert (timed["start_time"], timed["start_date"], timed["end_date"]) == ("2025-05-12T23:30:00Z", "2025-05-12", "2025-05-13")
+    assert timed["duration_minutes"] == 30
+    assert all_day["is_all_day"] and all_day["start_date"] == "2025-05-14"
+
+
+class _WindowedEventsService:
+    """Serves events.list per time window, two events per page, through a batch API."""
+
+    def __init__(self, events):
+        self.events_by_start = sorted(events, key=lambda e: e["start"]["dateTime"])
+        self.batch_sizes = []
+
+    def events(self):
+        return self
+
+    def list(self, timeMin, timeMax, pageToken=None, **kwargs):
+        window = [e for e in self.events_by_start if e["end"]["dateTime"] > timeMin and e["start"]["dateTime"] < timeMax]
+        offset = int(pageToken or 0)
+        response = {"items": window[offset:offset + 2]}
+        if offset + 2 < len(window):
+            response["nextPageToken"] = str(offset + 2)
+        return _Prepared(response)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batch_sizes.append(len(self.requests))
+        for request_id, request in self.requests:
+            self.callback(request_id, request.execute(), None)
+
+
+class _Prepared:
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response
+
+
+def test_get_calendar_events_fetches_weekly_windows_in_batches():
+    day0 = datetime.now(PARIS).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def event(event_id, start_day, start_hour, hours):
+        start = day0 + timedelta(days=start_day, hours=start_hour)
+        return {"id": event_id, "start": {"dateTime": start.isoformat()}, "end": {"dateTime": (start + timedelta(hours=hours)).isoformat()}}
+
+    events = [event("a", 0, 9, 1), event("b", 1, 9, 1), event("c", 2, 9, 1),
+              event("span", 6, 22, 4),  # crosses into the second week
+              event("d", 8, 9, 1), event("e", 15, 9, 1)]
+    service = _WindowedEventsService(events)
+    client = _RecordingCalendarClient()
+    client._get_service = lambda: service
+
+    result = GetCalendarEventsWrapper().run({"days": 20}, _context(client))
+
+    assert [e["id"] for e in result.result["events"]] == ["a", "b", "c", "span", "d", "e"]
+    # First round: all three weeks together; then only week one has more pages
+    assert service.batch_sizes == [3]
+
+
+def test_parse_datetimes_flexible_matches_single_parses():
+    strs = ("2025-05-10T09:00:00+02:00", None, "May 10 2025 3pm", "")
+
+    assert tool_wrappers.parse_datetimes_flexible(strs, PARIS) == tuple(parse_datetime_flexible(s, PARIS) for s in strs)
+
+
+def test_preferred_minutes_mask_matches_window_containment():
+    windows = ((time(9, 0), time(11, 30)), (time(14, 0), time(17, 0)), (time(22, 0), time(23, 59)))
+    mask = tool_wrappers._preferred_minutes_mask(windows)
+    day = datetime(2025, 5, 12, tzinfo=PARIS)
+
+    for start_min in range(0, 1440, 10):
+        for length in (15, 60, 150):
+            start = day + timedelta(minutes=start_min)
+            end = start + timedelta(minutes=length)
+            expected = end.date() == start.date() and any(ws <= start.time() and end.time() <= we for ws, we in windows)
+            assert tool_wrappers._within_preferred_minutes(mask, start, end) == expected, (start, end)
+
+    evening = tool_wrappers._preferred_minutes_mask(((time(20, 0), time(23, 59, 59)),))
+    assert not tool_wrappers._within_preferred_minutes(evening, day.replace(hour=23), day.replace(hour=23, minute=59, second=30))
+    assert tool_wrappers._within_preferred_minutes(evening, day.replace(hour=21), day.replace(hour=23, minute=59))
+
+
+def test_get_available_slots_groups_days_in_start_order():
+    day_after = timedelta(days=1)
+    slots = [TimeSlot(start_time=_tomorrow_at(h) + offset, end_time=_tomorrow_at(h + 1) + offset)
+             for h, offset in ((14, day_after), (15, timedelta()), (9, day_after), (9, timedelta()))]
+
+    result = GetAvailableSlotsWrapper().run({}, _context(_RecordingCalendarClient(free_slots=slots)))
+
+    assert result.status.value == "success"
+    listed = [(s["date"], s["start_time_local"]) for s in result.result["available_slots"]]
+    first, second = _tomorrow_at(9).date().isoformat(), (_tomorrow_at(9) + day_after).date().isoformat()
+    assert listed == [(first, "09:00 AM"), (first, "03:00 PM"), (second, "09:00 AM"), (second, "02:00 PM")]
+    assert list(result.result["slots_by_day"]) == [first, second]
+    assert result.result["slots_by_day"][first]["day_name"] == _tomorrow_at(9).strftime("%A")
+    assert result.result["slots_by_day"][first]["slot_count"] == 2
+    assert result.result["slots_by_day"][second]["total_available_hours"] == 2
+    assert result.result["summary"]["total_available_hours"] == 4
+
+
+def test_get_available_slots_applies_duration_and_weekend_filters():
+    base = _tomorrow_at(9)
+    saturday = base + timedelta(days=(5 - base.weekday()) % 7)
+    monday = saturday + timedelta(days=2)
+    slots = [TimeSlot(start_time=saturday, end_time=saturday + timedelta(hours=1)),
+             TimeSlot(start_time=monday, end_time=monday + timedelta(minutes=20)),
+             TimeSlot(start_time=monday + timedelta(hours=2), end_time=monday + timedelta(hours=3))]
+    client = _RecordingCalendarClient(free_slots=slots)
+
+    result = GetAvailableSlotsWrapper().run({"include_weekends": False, "days": 14}, _context(client))
+
+    assert [s["start_time"] for s in result.result["available_slots"]] == [slots[2].start_time.isoformat()]
+
+
+def test_get_available_slots_without_free_time_suggests_wider_search():
+    result = GetAvailableSlotsWrapper().run({"days": 3}, _context(_RecordingCalendarClient()))
+
+    assert result.status.value == "success"
+    assert result.result["message"].startswith("No available time slots found in the next 3 days")
+    assert result.result["summary"]["total_slots"] == 0 and result.result["summary"]["total_available_hours"] == 0
+    assert result.result["available_slots"] == [] and result.result["slots_by_day"] == {}
+    assert result.result["suggestions"]
+
+
+def test_availability_cache_is_bounded_and_drops_expired_entries(monkeypatch):
+    monkeypatch.setattr(tool_wrappers, "_AVAIL_MAX_ENTRIES", 3)
+    client = _RecordingCalendarClient()
+    start = _tomorrow_at(9)
+
+    for day in range(5):
+        tool_wrappers._cached_available_slots(_context(client), start + timedelta(days=day), start + timedelta(days=day + 7))
+    assert [key[1] for key in tool_wrappers._AVAIL_CACHE] == [(start + timedelta(days=d)).date() for d in (2, 3, 4)]
+
+    clock = tool_wrappers._time.monotonic() + tool_wrappers._AVAIL_TTL_S + 1
+    monkeypatch.setattr(tool_wrappers, "_time", SimpleNamespace(monotonic=lambda: clock))
+    tool_wrappers._cached_available_slots(_context(client), start, start + timedelta(days=7))
+    assert [key[1] for key in tool_wrappers._AVAIL_CACHE] == [start.date()]
+
+
+def test_availability_cache_survives_concurrent_fills_and_evictions():
+    client = _RecordingCalendarClient()
+    start = _tomorrow_at(9)
+    errors = []
+
+    def fill(user):
+        try:
+            for day in range(300):
+                context = ExecutionContext(user_id=user, preferences=_context(client).preferences, calendar_client=client)
+                tool_wrappers._cached_available_slots(context, start + timedelta(days=day), start + timedelta(days=day + 7))
+        except Exception as e:
+            errors.append(e)
+
+    def evict():
+        for _ in range(300):
+            tool_wrappers._invalidate_available_slots("u1")
+
+    threads = [threading.Thread(target=fill, args=(f"u{i}",)) for i in range(3)] + [threading.Thread(target=evict) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(tool_wrappers._AVAIL_CACHE) <= tool_wrappers._AVAIL_MAX_ENTRIES